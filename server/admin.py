@@ -3,17 +3,85 @@ from flask_admin import Admin, AdminIndexView, expose
 from flask_admin.contrib.sqla import ModelView
 from werkzeug.security import check_password_hash
 from models import db, User
+from types import MappingProxyType
+from dotenv import find_dotenv, load_dotenv
+import threading
 import os
 import json
 
-def load_admin_credentials():
-    """Load admin credentials - hardcoded for now"""
+# Admin credentials are hashed/parsed once and shared read-only; hashing the
+# fallback password is a deliberately slow KDF, so it must not run per request.
+# They are re-read when the .env file (as written by create_admin.py) changes.
+_ENV_PATH = find_dotenv(usecwd=True)
+_admin_credentials = None
+_admin_credentials_mtime = None
+_admin_credentials_lock = threading.Lock()
+
+def _env_mtime():
+    try:
+        return os.stat(_ENV_PATH).st_mtime_ns if _ENV_PATH else None
+    except OSError:
+        return None
+
+def _read_admin_credentials():
+    """Read admin credentials from the environment (as written by create_admin.py)"""
     from werkzeug.security import generate_password_hash
-    
-    # Hardcoded admin credentials
-    return {
-        "kosu": generate_password_hash("1402")
-    }
+
+    admins = {}
+    admins_json = os.getenv('ADMIN_CREDENTIALS')
+    if admins_json:
+        try:
+            admins = dict(json.loads(admins_json))
+        except (json.JSONDecodeError, TypeError, ValueError) as e:
+            print(f"❌ Invalid ADMIN_CREDENTIALS, ignoring it: {e}")
+            admins = {}
+
+    # Legacy single admin format
+    if not admins and os.getenv('ADMIN_USERNAME') and os.getenv('ADMIN_PASSWORD_HASH'):
+        admins = {os.getenv('ADMIN_USERNAME'): os.getenv('ADMIN_PASSWORD_HASH')}
+
+    # Hardcoded fallback admin
+    if not admins:
+        admins = {"kosu": generate_password_hash("1402")}
+
+    return MappingProxyType(admins)
+
+def load_admin_credentials():
+    """Return the cached admin credentials, loading them on first use and after .env changes"""
+    global _admin_credentials, _admin_credentials_mtime
+    mtime = _env_mtime()
+    if _admin_credentials is None or mtime != _admin_credentials_mtime:
+        with _admin_credentials_lock:
+            if _admin_credentials is None:
+                # config.py already loaded .env at startup
+                _admin_credentials = _read_admin_credentials()
+                _admin_credentials_mtime = mtime
+            elif mtime != _admin_credentials_mtime:
+                load_dotenv(_ENV_PATH, override=True)
+                _admin_credentials = _read_admin_credentials()
+                _admin_credentials_mtime = mtime
+    return _admin_credentials
+
+def reload_admin_credentials():
+    """Re-read .env and the environment, e.g. after running create_admin.py"""
+    global _admin_credentials, _admin_credentials_mtime
+    with _admin_credentials_lock:
+        mtime = _env_mtime()
+        if _ENV_PATH:
+            load_dotenv(_ENV_PATH, override=True)
+        _admin_credentials = _read_admin_credentials()
+        _admin_credentials_mtime = mtime
+    return _admin_credentials
+
+def notify_admin_credentials_changed():
+    """Touch .env so every running worker reloads the credentials on its next admin request.
+
+    Returns False when there is no .env file to touch.
+    """
+    if not _ENV_PATH or _env_mtime() is None:
+        return False
+    os.utime(_ENV_PATH)
+    return True
 
 # Simple Admin Index View without Flask-Admin authentication
 class SimpleAdminIndexView(AdminIndexView):
@@ -235,6 +303,10 @@ def init_app(app):
         from models import Person, Event, Transaction
         print("🔍 Initializing Flask-Admin...")
         
+        # Load (and hash) admin credentials once at startup
+        admin_credentials = load_admin_credentials()
+        print(f"✅ Loaded {len(admin_credentials)} admin credential(s)")
+
         # Initialize admin with app
         admin.init_app(app)
         print("✅ Admin initialized with app")
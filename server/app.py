@@ -5,30 +5,70 @@ from flask_migrate import Migrate
 from flask_cors import CORS
 from routes.auth_routes import auth_bp
 from utils.api_docs import api
+from utils.compression import compression
+from utils.mail_outbox import outbox
+from utils.hashing import hashing_pool
+from utils.lookup_cache import lookup_cache
+from utils.db_metrics import init_pool_metrics, pool_metrics
+from utils.db_routing import init_db_routing, read_only
+from utils.importer import init_importer
+from utils.json_provider import init_json
+from utils.reminders import init_reminders
+from models import rebuild_person_balances
 import admin
+import click
 import os
 
 def create_app(config_name='default'):
     # Initialize Flask App
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    init_json(app)
     
     # Enable CORS with proper configuration for production
     CORS(app, resources={
         r"/*": {
             "origins": os.getenv('ALLOWED_ORIGINS', '*').split(','),
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization", "If-None-Match"],
+            "expose_headers": ["ETag", "X-Next-Cursor"]
         }
     })
 
     # Initialize Extensions
     db.init_app(app)
     bcrypt.init_app(app)
+    hashing_pool.init_app(app)
     jwt.init_app(app)
     mail.init_app(app)
+    outbox.init_app(app)
+    lookup_cache.init_app(app)
+    compression.init_app(app)
     limiter.init_app(app)
     migrate = Migrate(app, db)
+    init_db_routing(app)
+    init_importer(app)
+    init_reminders(app)
+
+    @app.cli.command('rebuild-balances')
+    def rebuild_balances():
+        """Recompute every person_balance row from the transactions table."""
+        count = rebuild_person_balances()
+        db.session.commit()
+        click.echo(f"Rebuilt balances for {count} people")
+
+    @app.cli.command('reload-admins')
+    def reload_admins():
+        """Re-read admin credentials (e.g. after create_admin.py) in every worker."""
+        credentials = admin.reload_admin_credentials()
+        click.echo(f"Loaded {len(credentials)} admin(s): {', '.join(sorted(credentials))}")
+        if admin.notify_admin_credentials_changed():
+            click.echo("Running workers pick them up on their next admin request")
+        else:
+            click.echo("No .env file found; restart the server to apply credentials "
+                       "set in its environment", err=True)
+    with app.app_context():
+        init_pool_metrics(db.engine)
 
     # Register Blueprints
     from routes.api_routes import api_bp
@@ -199,7 +239,13 @@ def create_app(config_name='default'):
         except Exception as e:
             return {"status": "unhealthy", "database": "disconnected", "error": str(e)}, 500
 
+    @app.route('/db-pool')
+    def db_pool():
+        # Checkout/wait counters for sizing DB_POOL_SIZE against worker concurrency
+        return {"status": "ok", "pool": pool_metrics.snapshot(db.engine.pool)}, 200
+
     @app.route('/db-status')
+    @read_only
     def db_status():
         try:
             from models import User, Person, Event, Transaction
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Measure MPIN verification throughput for each bcrypt cost.
+
+Each login does one bcrypt check, so checks/sec on one core is the login
+ceiling of a single sync gunicorn worker. Use it to pick BCRYPT_LOG_ROUNDS
+for a latency budget:
+
+    python benchmarks/bcrypt_cost.py --min-cost 8 --max-cost 14
+"""
+
+import argparse
+import time
+import bcrypt
+
+def measure(cost, seconds):
+    """Return (checks per second, ms per check) for one core at the given cost"""
+    mpin = b'1234'
+    hashed = bcrypt.hashpw(mpin, bcrypt.gensalt(rounds=cost))
+    checks = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    # Always do at least two checks so slow costs still get a sample
+    while elapsed < seconds or checks < 2:
+        bcrypt.checkpw(mpin, hashed)
+        checks += 1
+        elapsed = time.perf_counter() - start
+    return checks / elapsed, elapsed / checks * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--min-cost', type=int, default=4)
+    parser.add_argument('--max-cost', type=int, default=14)
+    parser.add_argument('--seconds', type=float, default=2.0, help='time spent on each cost')
+    args = parser.parse_args()
+
+    print(f"{'cost':>4}  {'logins/sec/core':>15}  {'ms/login':>9}")
+    for cost in range(args.min_cost, args.max_cost + 1):
+        rate, ms = measure(cost, args.seconds)
+        print(f"{cost:>4}  {rate:>15.1f}  {ms:>9.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Measure how many transaction rows/sec the listing endpoints can turn into a
+JSON body, before and after the precompiled serializers and orjson.
+
+"before" is the old per-row getattr + strftime loop encoded with the stdlib
+json module (Flask's default provider); "after" is utils.serializers with
+utils.json_provider. Rows come from a real SQLAlchemy result, so the
+numbers include Row access:
+
+    python benchmarks/serialize_rows.py --rows 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import Boolean, DateTime, Float, Integer, String, column, create_engine, select, table
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.json_provider import OrjsonProvider, orjson
+from utils.serializers import format_date, row_serializer
+
+FIELDS = (
+    'transaction_id', 'person_id', 'person_name', 'event_id', 'event_name', 'amount',
+    'paid_amount', 'reason', 'due_date', 'status', 'created_date',
+)
+TYPES = (Integer, Integer, String, Integer, String, Float, Float, String, DateTime, Boolean, DateTime)
+
+OLD_FORMATTERS = {
+    'due_date': lambda v: v.strftime('%d-%m-%Y'),
+    'created_date': lambda v: v.strftime('%d-%m-%Y') if v else '',
+    'paid_amount': lambda v: v if v is not None else 0.0,
+    'event_name': lambda v: v if v is not None else 'N/A',
+}
+NEW_FORMATTERS = {
+    **OLD_FORMATTERS,
+    'due_date': format_date,
+    'created_date': lambda v: format_date(v) if v else '',
+}
+
+def load_rows(count):
+    """Return count result rows shaped like GET /api/transactions reads them"""
+    engine = create_engine('sqlite://')
+    start = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"CREATE TABLE t ({', '.join(FIELDS)})")
+        conn.exec_driver_sql(
+            f"INSERT INTO t VALUES ({', '.join('?' * len(FIELDS))})",
+            [(i, i % 50, f'person {i % 50}', (i % 7) or None, f'event {i % 7}' if i % 7 else None,
+              125.5, 20.0, f'dinner at place {i % 300}',
+              (start + timedelta(days=i % 90)).isoformat(' '), i % 3 == 0,
+              (start + timedelta(minutes=i)).isoformat(' '))
+             for i in range(count)],
+        )
+        query = select(*[column(f, type_) for f, type_ in zip(FIELDS, TYPES)]).select_from(table('t'))
+        return conn.execute(query).all()
+
+def serialize_before(rows):
+    formatters = [(f, OLD_FORMATTERS.get(f)) for f in FIELDS]
+    items = []
+    for row in rows:
+        item = {}
+        for f, fmt in formatters:
+            value = getattr(row, f)
+            item[f] = fmt(value) if fmt else value
+        items.append(item)
+    return items
+
+def serialize_after(rows):
+    return list(map(row_serializer(FIELDS, NEW_FORMATTERS), rows))
+
+def measure(fn, rows, repeat):
+    """Return rows per second for the best of repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - start)
+    return len(rows) / best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5, help='runs per case, the best one counts')
+    args = parser.parse_args()
+
+    rows = load_rows(args.rows)
+    app = Flask(__name__)
+    stdlib_dumps = DefaultJSONProvider(app).dumps
+    cases = [
+        ('rows -> dicts', 'before', serialize_before),
+        ('rows -> dicts', 'after', serialize_after),
+        ('rows -> JSON', 'before', lambda r: stdlib_dumps(serialize_before(r), separators=(',', ':'))),
+    ]
+    if orjson is not None:
+        orjson_dumps = OrjsonProvider(app).dumps
+        cases.append(('rows -> JSON', 'after', lambda r: orjson_dumps(serialize_after(r))))
+    else:
+        print("orjson is not installed; the stdlib is used for both JSON cases")
+        cases.append(('rows -> JSON', 'after', lambda r: stdlib_dumps(serialize_after(r), separators=(',', ':'))))
+
+    print(f"{'stage':<14}  {'version':<7}  {'rows/sec':>12}")
+    for stage, version, fn in cases:
+        print(f"{stage:<14}  {version:<7}  {measure(fn, rows, args.repeat):>12,.0f}")
+
+if __name__ == '__main__':
+    main()
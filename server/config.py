@@ -1,19 +1,60 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 from datetime import timedelta
+from utils.db_metrics import InstrumentedQueuePool
 
 load_dotenv()
 
+def psycopg_url(url):
+    """Handle both postgres:// and postgresql:// schemes and use the psycopg dialect"""
+    if url.startswith('postgres://'):
+        return url.replace('postgres://', 'postgresql+psycopg://', 1)
+    if url.startswith('postgresql://'):
+        return url.replace('postgresql://', 'postgresql+psycopg://', 1)
+    return url
+
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'default_secret_key')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+    # bcrypt work factor for MPIN hashes; see benchmarks/bcrypt_cost.py for the throughput of each cost
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', '12'))
+    # Request threads per gunicorn worker (gthread), as passed to --threads in the Procfile
+    GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', '8'))
+    # Concurrent bcrypt operations per process, and how many more may wait before we answer 503.
+    # Keep the sum below GUNICORN_THREADS so some threads stay free for cheap requests.
+    HASH_POOL_SIZE = int(os.getenv('HASH_POOL_SIZE', str(min(os.cpu_count() or 1, 2))))
+    HASH_POOL_QUEUE = int(os.getenv('HASH_POOL_QUEUE', '4'))
+    # Seconds a worker trusts its cached people/events before re-checking the DB (0 disables)
+    LOOKUP_CACHE_TTL = int(os.getenv('LOOKUP_CACHE_TTL', '30'))
+    LOOKUP_CACHE_MAX_ROWS = int(os.getenv('LOOKUP_CACHE_MAX_ROWS', '5000'))
+    # 'orjson' (falls back to the stdlib when orjson isn't installed) or 'default'
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson')
+    # Responses smaller than this many bytes are sent uncompressed; brotli is
+    # offered alongside gzip when the brotli package is installed
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '5'))
+    # Per-process memory for compressed bodies of unchanged ETag'd responses (0 disables)
+    COMPRESS_CACHE_BYTES = int(os.getenv('COMPRESS_CACHE_BYTES', str(16 * 1024 * 1024)))
     MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
     MAIL_PORT = int(os.getenv('MAIL_PORT', '587'))
     MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', 'True').lower() == 'true'
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
+    # From address of reminder digests
+    MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', MAIL_USERNAME)
+    # 'thread' sends queued mail from each web process, 'external' leaves it to `flask mail-worker`
+    MAIL_OUTBOX_WORKER = os.getenv('MAIL_OUTBOX_WORKER', 'thread')
+    MAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('MAIL_OUTBOX_MAX_ATTEMPTS', '5'))
+    MAIL_OUTBOX_POLL_SECONDS = int(os.getenv('MAIL_OUTBOX_POLL_SECONDS', '30'))
+    MAIL_OUTBOX_IDLE_SECONDS = int(os.getenv('MAIL_OUTBOX_IDLE_SECONDS', '60'))
+    # Rate limit counters must be shared by all gunicorn workers: use redis://host:port
+    # (needs the redis package) or sqlite:////path/ratelimits.db on a single host
+    RATELIMIT_STORAGE_URI = os.getenv('RATELIMIT_STORAGE_URI', 'memory://')
+    RATELIMIT_STRATEGY = os.getenv('RATELIMIT_STRATEGY', 'moving-window')
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -21,22 +62,43 @@ class DevelopmentConfig(Config):
 
 class ProductionConfig(Config):
     DEBUG = False
+    RATELIMIT_STORAGE_URI = os.getenv(
+        'RATELIMIT_STORAGE_URI',
+        'sqlite:///' + os.path.join(tempfile.gettempdir(), 'chillar_ratelimits.db')
+    )
     
     # Set SQLALCHEMY_DATABASE_URI at class definition time
     _database_url = os.getenv('DATABASE_URL')
     if _database_url:
-        # Handle both postgres:// and postgresql:// schemes and use psycopg dialect
-        if _database_url.startswith('postgres://'):
-            _database_url = _database_url.replace('postgres://', 'postgresql+psycopg://', 1)
-        elif _database_url.startswith('postgresql://'):
-            _database_url = _database_url.replace('postgresql://', 'postgresql+psycopg://', 1)
-        SQLALCHEMY_DATABASE_URI = _database_url
+        SQLALCHEMY_DATABASE_URI = psycopg_url(_database_url)
+        # Size the pool against gunicorn concurrency (workers x threads) and the
+        # server's max_connections; pre-ping and recycle drop connections the
+        # database closed while Render had it idle
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'poolclass': InstrumentedQueuePool,
+            'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+            'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+            'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '300')),
+            'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true',
+            'connect_args': {
+                'options': f"-c statement_timeout={int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))}"
+            },
+        }
     else:
         # Fallback for development/testing
         SQLALCHEMY_DATABASE_URI = 'sqlite:///chillar_prod.db'
 
+    # Optional read replica for @read_only views (see utils/db_routing.py)
+    _replica_url = os.getenv('DATABASE_REPLICA_URL')
+    if _replica_url:
+        SQLALCHEMY_BINDS = {'replica': psycopg_url(_replica_url)}
+        # Clients read from the primary for this long after a write
+        REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '5'))
+
 class TestingConfig(Config):
     TESTING = True
+    BCRYPT_LOG_ROUNDS = 4
     SQLALCHEMY_DATABASE_URI = 'sqlite:///test_chillar.db'
 
 config = {
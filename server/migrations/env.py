@@ -90,9 +90,19 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # Full-text search objects are created with raw DDL (utils/search.py) and
+    # have no model, so autogenerate must not try to drop them
+    def include_object(object, name, type_, reflected, compare_to):
+        if type_ == 'table' and name.startswith('transaction_search'):
+            return False
+        if name in ('search_vector', 'ix_transaction_search_vector'):
+            return False
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
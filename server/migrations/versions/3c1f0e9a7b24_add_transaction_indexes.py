@@ -0,0 +1,40 @@
+"""add indexes for transaction filters
+
+Revision ID: 3c1f0e9a7b24
+Revises: 7d8a12e55b72
+Create Date: 2026-10-17 10:12:41.208311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f0e9a7b24'
+down_revision = '7d8a12e55b72'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transaction', schema=None) as batch_op:
+        batch_op.create_index('ix_transaction_person_id_status', ['person_id', 'status'], unique=False)
+        batch_op.create_index('ix_transaction_event_id', ['event_id'], unique=False)
+        batch_op.create_index('ix_transaction_status_due_date', ['status', 'due_date'], unique=False)
+        batch_op.create_index('ix_transaction_created_date_id', ['created_date', 'transaction_id'], unique=False)
+        # Partial index: the predicate must match what SQLAlchemy renders for
+        # `Transaction.status == False` on each dialect or the planner skips it.
+        batch_op.create_index(
+            'ix_transaction_unpaid_due_date', ['due_date'], unique=False,
+            sqlite_where=sa.text('status = 0'),
+            postgresql_where=sa.text('status = false'),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('transaction', schema=None) as batch_op:
+        batch_op.drop_index('ix_transaction_unpaid_due_date')
+        batch_op.drop_index('ix_transaction_created_date_id')
+        batch_op.drop_index('ix_transaction_status_due_date')
+        batch_op.drop_index('ix_transaction_event_id')
+        batch_op.drop_index('ix_transaction_person_id_status')
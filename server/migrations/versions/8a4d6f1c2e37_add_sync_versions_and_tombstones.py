@@ -0,0 +1,59 @@
+"""add sync versions, change counter and tombstones
+
+Revision ID: 8a4d6f1c2e37
+Revises: 5e2b7c4d9a10
+Create Date: 2026-10-17 12:20:05.918442
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4d6f1c2e37'
+down_revision = '5e2b7c4d9a10'
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = ('person', 'event', 'transaction')
+
+
+def upgrade():
+    change_counter = op.create_table('change_counter',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(change_counter, [{'name': 'sync', 'value': 0}])
+
+    op.create_table('sync_tombstone',
+    sa.Column('tombstone_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('tombstone_id')
+    )
+    with op.batch_alter_table('sync_tombstone', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_sync_tombstone_version'), ['version'], unique=False)
+
+    # Existing rows start at version 0 and are only returned by a full sync
+    for table in SYNCED_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+            batch_op.add_column(sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'))
+            batch_op.create_index(batch_op.f(f'ix_{table}_version'), ['version'], unique=False)
+
+
+def downgrade():
+    for table in reversed(SYNCED_TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_version'))
+            batch_op.drop_column('version')
+            batch_op.drop_column('updated_at')
+
+    with op.batch_alter_table('sync_tombstone', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_sync_tombstone_version'))
+
+    op.drop_table('sync_tombstone')
+    op.drop_table('change_counter')
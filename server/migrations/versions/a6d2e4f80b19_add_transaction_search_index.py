@@ -0,0 +1,131 @@
+"""add full-text search index over transactions
+
+Revision ID: a6d2e4f80b19
+Revises: f3b8c2d61a07
+Create Date: 2026-10-17 17:05:31.927450
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2e4f80b19'
+down_revision = 'f3b8c2d61a07'
+branch_labels = None
+depends_on = None
+
+# Same objects as utils/search.py creates for db.create_all(). Note that a
+# later batch_alter_table on "transaction" rebuilds the table on SQLite and
+# drops its triggers; such a migration must recreate them.
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE transaction_search USING fts5("
+    "reason, person_name, event_name, tokenize = 'unicode61 remove_diacritics 2')",
+    """CREATE TRIGGER transaction_search_insert AFTER INSERT ON "transaction" BEGIN
+        INSERT INTO transaction_search (rowid, reason, person_name, event_name) VALUES (
+            new.transaction_id, new.reason,
+            (SELECT person_name FROM person WHERE person_id = new.person_id),
+            (SELECT event_name FROM event WHERE event_id = new.event_id));
+    END""",
+    """CREATE TRIGGER transaction_search_update
+    AFTER UPDATE OF reason, person_id, event_id ON "transaction" BEGIN
+        UPDATE transaction_search SET
+            reason = new.reason,
+            person_name = (SELECT person_name FROM person WHERE person_id = new.person_id),
+            event_name = (SELECT event_name FROM event WHERE event_id = new.event_id)
+        WHERE rowid = new.transaction_id;
+    END""",
+    """CREATE TRIGGER transaction_search_delete AFTER DELETE ON "transaction" BEGIN
+        DELETE FROM transaction_search WHERE rowid = old.transaction_id;
+    END""",
+    """CREATE TRIGGER person_search_rename AFTER UPDATE OF person_name ON person BEGIN
+        UPDATE transaction_search SET person_name = new.person_name
+        WHERE rowid IN (SELECT transaction_id FROM "transaction" WHERE person_id = new.person_id);
+    END""",
+    """CREATE TRIGGER event_search_rename AFTER UPDATE OF event_name ON event BEGIN
+        UPDATE transaction_search SET event_name = new.event_name
+        WHERE rowid IN (SELECT transaction_id FROM "transaction" WHERE event_id = new.event_id);
+    END""",
+    """INSERT INTO transaction_search (rowid, reason, person_name, event_name)
+    SELECT t.transaction_id, t.reason, p.person_name, e.event_name
+    FROM "transaction" t
+    LEFT JOIN person p ON p.person_id = t.person_id
+    LEFT JOIN event e ON e.event_id = t.event_id""",
+]
+
+SQLITE_DOWNGRADE = [
+    'DROP TRIGGER IF EXISTS event_search_rename',
+    'DROP TRIGGER IF EXISTS person_search_rename',
+    'DROP TRIGGER IF EXISTS transaction_search_delete',
+    'DROP TRIGGER IF EXISTS transaction_search_update',
+    'DROP TRIGGER IF EXISTS transaction_search_insert',
+    'DROP TABLE IF EXISTS transaction_search',
+]
+
+POSTGRES_UPGRADE = [
+    'ALTER TABLE "transaction" ADD COLUMN search_vector tsvector',
+    """CREATE OR REPLACE FUNCTION transaction_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(
+                (SELECT person_name FROM person WHERE person_id = NEW.person_id), '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(
+                (SELECT event_name FROM event WHERE event_id = NEW.event_id), '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.reason, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    """CREATE TRIGGER transaction_search_vector
+    BEFORE INSERT OR UPDATE OF reason, person_id, event_id ON "transaction"
+    FOR EACH ROW EXECUTE FUNCTION transaction_search_vector()""",
+    """CREATE OR REPLACE FUNCTION transaction_search_rename() RETURNS trigger AS $$
+    BEGIN
+        IF TG_TABLE_NAME = 'person' THEN
+            UPDATE "transaction" SET person_id = person_id WHERE person_id = NEW.person_id;
+        ELSE
+            UPDATE "transaction" SET event_id = event_id WHERE event_id = NEW.event_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+    """CREATE TRIGGER person_search_rename AFTER UPDATE OF person_name ON person
+    FOR EACH ROW WHEN (OLD.person_name IS DISTINCT FROM NEW.person_name)
+    EXECUTE FUNCTION transaction_search_rename()""",
+    """CREATE TRIGGER event_search_rename AFTER UPDATE OF event_name ON event
+    FOR EACH ROW WHEN (OLD.event_name IS DISTINCT FROM NEW.event_name)
+    EXECUTE FUNCTION transaction_search_rename()""",
+    # Backfill through the row trigger, then build the index in one pass
+    'UPDATE "transaction" SET reason = reason',
+    'CREATE INDEX ix_transaction_search_vector ON "transaction" USING gin (search_vector)',
+]
+
+POSTGRES_DOWNGRADE = [
+    'DROP TRIGGER IF EXISTS event_search_rename ON event',
+    'DROP TRIGGER IF EXISTS person_search_rename ON person',
+    'DROP TRIGGER IF EXISTS transaction_search_vector ON "transaction"',
+    'DROP FUNCTION IF EXISTS transaction_search_rename()',
+    'DROP FUNCTION IF EXISTS transaction_search_vector()',
+    'DROP INDEX IF EXISTS ix_transaction_search_vector',
+    'ALTER TABLE "transaction" DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def _run(statements):
+    for statement in statements:
+        op.execute(statement)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        _run(SQLITE_UPGRADE)
+    elif dialect == 'postgresql':
+        _run(POSTGRES_UPGRADE)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        _run(SQLITE_DOWNGRADE)
+    elif dialect == 'postgresql':
+        _run(POSTGRES_DOWNGRADE)
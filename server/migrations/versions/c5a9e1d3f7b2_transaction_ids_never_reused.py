@@ -0,0 +1,87 @@
+"""never reuse transaction ids on sqlite
+
+Revision ID: c5a9e1d3f7b2
+Revises: a6d2e4f80b19
+Create Date: 2026-10-18 09:12:44.518306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a9e1d3f7b2'
+down_revision = 'a6d2e4f80b19'
+branch_labels = None
+depends_on = None
+
+# The search triggers from a6d2e4f80b19. Rebuilding the table drops its own
+# triggers, and SQLite refuses to rename the rebuilt table into place while
+# the person/event rename triggers refer to it, so all are dropped first.
+SEARCH_TRIGGER_NAMES = [
+    'transaction_search_insert', 'transaction_search_update', 'transaction_search_delete',
+    'person_search_rename', 'event_search_rename',
+]
+SEARCH_TRIGGERS = [
+    """CREATE TRIGGER transaction_search_insert AFTER INSERT ON "transaction" BEGIN
+        INSERT INTO transaction_search (rowid, reason, person_name, event_name) VALUES (
+            new.transaction_id, new.reason,
+            (SELECT person_name FROM person WHERE person_id = new.person_id),
+            (SELECT event_name FROM event WHERE event_id = new.event_id));
+    END""",
+    """CREATE TRIGGER transaction_search_update
+    AFTER UPDATE OF reason, person_id, event_id ON "transaction" BEGIN
+        UPDATE transaction_search SET
+            reason = new.reason,
+            person_name = (SELECT person_name FROM person WHERE person_id = new.person_id),
+            event_name = (SELECT event_name FROM event WHERE event_id = new.event_id)
+        WHERE rowid = new.transaction_id;
+    END""",
+    """CREATE TRIGGER transaction_search_delete AFTER DELETE ON "transaction" BEGIN
+        DELETE FROM transaction_search WHERE rowid = old.transaction_id;
+    END""",
+    """CREATE TRIGGER person_search_rename AFTER UPDATE OF person_name ON person BEGIN
+        UPDATE transaction_search SET person_name = new.person_name
+        WHERE rowid IN (SELECT transaction_id FROM "transaction" WHERE person_id = new.person_id);
+    END""",
+    """CREATE TRIGGER event_search_rename AFTER UPDATE OF event_name ON event BEGIN
+        UPDATE transaction_search SET event_name = new.event_name
+        WHERE rowid IN (SELECT transaction_id FROM "transaction" WHERE event_id = new.event_id);
+    END""",
+]
+
+
+def _rebuild(autoincrement):
+    for name in SEARCH_TRIGGER_NAMES:
+        op.execute(f'DROP TRIGGER IF EXISTS {name}')
+    with op.batch_alter_table('transaction', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': autoincrement}):
+        pass
+    for statement in SEARCH_TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade():
+    # Postgres sequences never hand out an id twice; SQLite without
+    # AUTOINCREMENT reuses the ids of deleted rows, which then collide with
+    # transaction_archive and make sync tombstones ambiguous
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild(True)
+    # Start after every id ever handed out, including deleted ones that are
+    # only left in the archive or in tombstones
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'transaction'")
+    op.execute("""
+        INSERT INTO sqlite_sequence (name, seq)
+        SELECT 'transaction', coalesce(max(id), 0) FROM (
+            SELECT max(transaction_id) AS id FROM "transaction"
+            UNION ALL SELECT max(transaction_id) FROM transaction_archive
+            UNION ALL SELECT max(entity_id) FROM sync_tombstone WHERE entity = 'transaction'
+        )
+    """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild(False)
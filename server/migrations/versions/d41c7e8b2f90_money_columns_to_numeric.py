@@ -0,0 +1,68 @@
+"""store money columns as numeric(12, 2)
+
+Revision ID: d41c7e8b2f90
+Revises: b7e3a9d05c61
+Create Date: 2026-10-17 15:02:37.480193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41c7e8b2f90'
+down_revision = 'b7e3a9d05c61'
+branch_labels = None
+depends_on = None
+
+MONEY_TABLES = ('transaction', 'transaction_archive')
+
+
+def upgrade():
+    for table in MONEY_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('amount',
+                   existing_type=sa.Float(),
+                   type_=sa.Numeric(precision=12, scale=2),
+                   existing_nullable=False)
+            batch_op.alter_column('paid_amount',
+                   existing_type=sa.Float(),
+                   type_=sa.Numeric(precision=12, scale=2),
+                   existing_nullable=False)
+
+    transaction = sa.table('transaction',
+        sa.column('amount'), sa.column('paid_amount'), sa.column('status'), sa.column('version'))
+    if op.get_bind().dialect.name != 'postgresql':
+        # Postgres rounds to the new scale while converting; SQLite keeps the
+        # stored REAL values, so round them here
+        op.execute(transaction.update().values(
+            amount=sa.func.round(transaction.c.amount, 2),
+            paid_amount=sa.func.round(transaction.c.paid_amount, 2),
+        ))
+
+    # Settle the transactions that float drift left unpaid after being paid
+    # in full, under a new sync version so clients pick up the change
+    change_counter = sa.table('change_counter', sa.column('name'), sa.column('value'))
+    op.execute(change_counter.update()
+               .where(change_counter.c.name == 'sync')
+               .values(value=change_counter.c.value + 1))
+    op.execute(transaction.update()
+               .where(transaction.c.status == sa.false())
+               .where(transaction.c.paid_amount >= transaction.c.amount)
+               .values(status=sa.true(),
+                       version=sa.select(change_counter.c.value)
+                       .where(change_counter.c.name == 'sync')
+                       .scalar_subquery()))
+
+
+def downgrade():
+    for table in MONEY_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('paid_amount',
+                   existing_type=sa.Numeric(precision=12, scale=2),
+                   type_=sa.Float(),
+                   existing_nullable=False)
+            batch_op.alter_column('amount',
+                   existing_type=sa.Numeric(precision=12, scale=2),
+                   type_=sa.Float(),
+                   existing_nullable=False)
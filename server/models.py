@@ -1,5 +1,10 @@
+from flask import current_app
 from extensions import db, bcrypt
+from utils.hashing import hashing_pool
 from datetime import datetime, timedelta
+from itertools import chain
+from sqlalchemy import case, event, func, literal
+from sqlalchemy.orm import Session
 
 
 
@@ -20,16 +25,28 @@ class User(db.Model):
     def verify_otp(self, otp):
         return self.otp == otp and self.otp_expiry and datetime.utcnow() < self.otp_expiry
     def set_mPin(self,mPin):
-        self.mPin_hash=bcrypt.generate_password_hash(mPin).decode('utf-8')
+        self.mPin_hash=hashing_pool.run(bcrypt.generate_password_hash,mPin).decode('utf-8')
         
     def check_mPin(self,mPin):
-        return bcrypt.check_password_hash(self.mPin_hash,mPin)
+        return hashing_pool.run(bcrypt.check_password_hash,self.mPin_hash,mPin)
+
+    def mPin_needs_rehash(self):
+        """True when the stored hash was made with a different cost than BCRYPT_LOG_ROUNDS"""
+        # bcrypt hashes look like $2b$<cost>$<salt+digest>
+        try:
+            cost = int(self.mPin_hash.split('$')[2])
+        except (AttributeError, IndexError, ValueError):
+            return True
+        return cost != current_app.config['BCRYPT_LOG_ROUNDS']
     
     
     
 class Person(db.Model):
     person_id=db.Column(db.Integer,primary_key=True,autoincrement=True)
     person_name=db.Column(db.String(50),nullable=False,unique=True)
+    email=db.Column(db.String(120),nullable=True)
+    updated_at=db.Column(db.DateTime,nullable=True)
+    version=db.Column(db.BigInteger,nullable=False,default=0,server_default='0',index=True)
     
     def __repr__(self):
         return f"<Person {self.person_name}>"
@@ -39,25 +56,293 @@ class Person(db.Model):
 class Event(db.Model):
     event_id=db.Column(db.Integer,primary_key=True,autoincrement=True)
     event_name=db.Column(db.String(50),nullable=False,unique=True)
+    updated_at=db.Column(db.DateTime,nullable=True)
+    version=db.Column(db.BigInteger,nullable=False,default=0,server_default='0',index=True)
     
     def __repr__(self):
         return f"<Event {self.event_name}>"
     
     
 
+# Money is stored exactly, to the cent, but read back as float
+MONEY = db.Numeric(12, 2, asdecimal=False)
+
 class Transaction(db.Model):
     transaction_id=db.Column(db.Integer,primary_key=True,autoincrement=True)
     person_id=db.Column(db.Integer,db.ForeignKey('person.person_id'),nullable=False)
     event_id=db.Column(db.Integer,db.ForeignKey('event.event_id'),nullable=True)
-    amount=db.Column(db.Float,nullable=False)
-    paid_amount=db.Column(db.Float,nullable=False,default=0.0)
+    amount=db.Column(MONEY,nullable=False)
+    paid_amount=db.Column(MONEY,nullable=False,default=0)
     reason=db.Column(db.String(500),nullable=False)
     due_date=db.Column(db.DateTime,nullable=False)
     status=db.Column(db.Boolean,nullable=False,default=False)
     created_date=db.Column(db.DateTime,nullable=False,default=datetime.utcnow)
+    updated_at=db.Column(db.DateTime,nullable=True)
+    version=db.Column(db.BigInteger,nullable=False,default=0,server_default='0',index=True)
 
     person = db.relationship('Person', backref=db.backref('transactions', lazy=True))
     event = db.relationship('Event', backref=db.backref('transactions', lazy=True))
 
+    __table_args__ = (
+        db.Index('ix_transaction_person_id_status', 'person_id', 'status'),
+        db.Index('ix_transaction_event_id', 'event_id'),
+        db.Index('ix_transaction_status_due_date', 'status', 'due_date'),
+        db.Index('ix_transaction_created_date_id', 'created_date', 'transaction_id'),
+        db.Index('ix_transaction_unpaid_due_date', 'due_date',
+                 sqlite_where=db.text('status = 0'),
+                 postgresql_where=db.text('status = false')),
+        # Never reuse the ids of deleted rows on SQLite: they live on in
+        # transaction_archive and in sync tombstones
+        {'sqlite_autoincrement': True},
+    )
+
     def __repr__(self):
         return f"<Transaction {self.transaction_id} - {self.amount} - {'Paid' if self.status else 'Pending'}>"
+
+
+
+# Columns copied from transaction into transaction_archive by clear-paid
+ARCHIVED_COLUMNS = [
+    'transaction_id', 'person_id', 'event_id', 'amount', 'paid_amount',
+    'reason', 'due_date', 'status', 'created_date',
+]
+
+
+class TransactionArchive(db.Model):
+    __tablename__ = 'transaction_archive'
+
+    transaction_id=db.Column(db.Integer,primary_key=True,autoincrement=False)
+    person_id=db.Column(db.Integer,nullable=False)
+    event_id=db.Column(db.Integer,nullable=True)
+    amount=db.Column(MONEY,nullable=False)
+    paid_amount=db.Column(MONEY,nullable=False,default=0)
+    reason=db.Column(db.String(500),nullable=False)
+    due_date=db.Column(db.DateTime,nullable=False)
+    status=db.Column(db.Boolean,nullable=False,default=True)
+    created_date=db.Column(db.DateTime,nullable=False)
+    archived_date=db.Column(db.DateTime,nullable=False,default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TransactionArchive {self.transaction_id} - {self.amount}>"
+
+
+
+
+class OutboxMessage(db.Model):
+    __tablename__ = 'mail_outbox'
+
+    message_id=db.Column(db.Integer,primary_key=True,autoincrement=True)
+    subject=db.Column(db.String(255),nullable=False)
+    sender=db.Column(db.String(120),nullable=False)
+    recipients=db.Column(db.Text,nullable=False)
+    body=db.Column(db.Text,nullable=False)
+    status=db.Column(db.String(10),nullable=False,default='pending')
+    attempts=db.Column(db.Integer,nullable=False,default=0)
+    next_attempt_at=db.Column(db.DateTime,nullable=False,default=datetime.utcnow)
+    last_error=db.Column(db.Text,nullable=True)
+    created_at=db.Column(db.DateTime,nullable=False,default=datetime.utcnow)
+    sent_at=db.Column(db.DateTime,nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_mail_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f"<OutboxMessage {self.message_id} {self.status}>"
+
+class PersonBalance(db.Model):
+    """Per-person totals over the person's transactions, kept current on every write"""
+    __tablename__ = 'person_balance'
+
+    person_id=db.Column(db.Integer,db.ForeignKey('person.person_id',ondelete='CASCADE'),primary_key=True)
+    outstanding=db.Column(MONEY,nullable=False,default=0)
+    paid_amount=db.Column(MONEY,nullable=False,default=0)
+    transaction_count=db.Column(db.Integer,nullable=False,default=0)
+    unpaid_count=db.Column(db.Integer,nullable=False,default=0)
+    oldest_due_date=db.Column(db.DateTime,nullable=True)
+    updated_at=db.Column(db.DateTime,nullable=False,default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PersonBalance {self.person_id} outstanding={self.outstanding}>"
+
+
+def _balance_select(now):
+    unpaid = Transaction.status == False
+    return db.select(
+        Transaction.person_id,
+        func.round(func.coalesce(func.sum(case((unpaid, Transaction.amount - Transaction.paid_amount), else_=0)), 0), 2),
+        func.round(func.coalesce(func.sum(Transaction.paid_amount), 0), 2),
+        func.count(Transaction.transaction_id),
+        func.count(case((unpaid, Transaction.transaction_id))),
+        func.min(case((unpaid, Transaction.due_date))),
+        literal(now, db.DateTime),
+    ).group_by(Transaction.person_id)
+
+_BALANCE_COLUMNS = [
+    'person_id', 'outstanding', 'paid_amount', 'transaction_count', 'unpaid_count', 'oldest_due_date', 'updated_at',
+]
+
+
+def refresh_person_balances(person_ids, session=None):
+    """Recompute the person_balance rows of the given people in the current transaction"""
+    person_ids = sorted({pid for pid in person_ids if pid is not None})
+    if not person_ids:
+        return
+    session = session or db.session
+    connection = session.connection()
+    table = PersonBalance.__table__
+    # Lock the people (in id order) so two transactions refreshing the same
+    # person run one after the other instead of racing on the primary key.
+    # FOR NO KEY UPDATE, not FOR UPDATE: inserting a transaction already holds
+    # FOR KEY SHARE on its person through the foreign key, and FOR UPDATE
+    # would deadlock two concurrent inserts for the same person on Postgres.
+    connection.execute(
+        db.select(Person.person_id).where(Person.person_id.in_(person_ids))
+        .order_by(Person.person_id).with_for_update(key_share=True)
+    )
+    connection.execute(table.delete().where(table.c.person_id.in_(person_ids)))
+    connection.execute(table.insert().from_select(
+        _BALANCE_COLUMNS,
+        _balance_select(datetime.utcnow()).where(Transaction.person_id.in_(person_ids)),
+    ))
+
+
+def rebuild_person_balances(session=None):
+    """Recompute every person_balance row from scratch; returns the number of rows"""
+    session = session or db.session
+    # Repaired balances must not be hidden behind a cached ETag. Bumped
+    # first: writers hold the counter lock while refreshing their balance
+    # rows, so taking it after deleting every row would deadlock with them.
+    bump_counter(SYNC_COUNTER, session)
+    connection = session.connection()
+    table = PersonBalance.__table__
+    connection.execute(table.delete())
+    return connection.execute(table.insert().from_select(
+        _BALANCE_COLUMNS, _balance_select(datetime.utcnow())
+    )).rowcount
+
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_balances_after_flush(session, flush_context):
+    # Covers ORM writes (add_transaction, PATCH, the admin panel); Core
+    # statements call refresh_person_balances themselves
+    person_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Transaction) and (obj not in session.dirty or session.is_modified(obj)):
+            person_ids.add(obj.person_id)
+            # A transaction moved to another person changes both balances
+            person_ids.update(db.inspect(obj).attrs.person_id.history.deleted or ())
+    refresh_person_balances(person_ids, session)
+
+
+# Sync versioning: every write to a synced table stamps the affected rows with
+# a value from a single monotonic counter, so "everything with version > N"
+# is the change feed since token N. Deletes leave a tombstone instead.
+SYNC_COUNTER = 'sync'
+
+# Bumped by any write to the people or event tables, so each worker's
+# lookup cache can tell whether its copy is still current.
+LOOKUP_COUNTER = 'lookups'
+LOOKUP_MODELS = (Person, Event)
+
+# Tombstone entity name for each synced model
+SYNCED_ENTITIES = {
+    Person: 'person',
+    Event: 'event',
+    Transaction: 'transaction',
+}
+
+
+class ChangeCounter(db.Model):
+    __tablename__ = 'change_counter'
+
+    name=db.Column(db.String(50),primary_key=True)
+    value=db.Column(db.BigInteger,nullable=False,default=0)
+
+    def __repr__(self):
+        return f"<ChangeCounter {self.name}={self.value}>"
+
+
+class SyncTombstone(db.Model):
+    __tablename__ = 'sync_tombstone'
+
+    tombstone_id=db.Column(db.Integer,primary_key=True,autoincrement=True)
+    entity=db.Column(db.String(20),nullable=False)
+    entity_id=db.Column(db.Integer,nullable=False)
+    version=db.Column(db.BigInteger,nullable=False,index=True)
+    deleted_at=db.Column(db.DateTime,nullable=False,default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SyncTombstone {self.entity} {self.entity_id} @{self.version}>"
+
+
+def bump_counter(name, session=None):
+    """Increment the named counter and return its new value.
+
+    The UPDATE keeps the counter row locked until the surrounding
+    transaction ends, so values become visible in commit order.
+    """
+    session = session or db.session
+    table = ChangeCounter.__table__
+    value = session.connection().execute(
+        table.update()
+        .where(table.c.name == name)
+        .values(value=table.c.value + 1)
+        .returning(table.c.value)
+    ).scalar()
+    if value is None:
+        # Databases built with db.create_all() have no seeded counter row
+        session.connection().execute(table.insert().values(name=name, value=1))
+        value = 1
+    return value
+
+
+def current_counter(name, session=None):
+    """Return the committed value of the named counter (0 if it was never bumped)"""
+    session = session or db.session
+    table = ChangeCounter.__table__
+    value = session.execute(db.select(table.c.value).where(table.c.name == name)).scalar()
+    return value or 0
+
+
+def next_sync_version(session=None):
+    """Return the sync version for the current transaction, reserving it on first use"""
+    session = session or db.session
+    version = session.info.get('sync_version')
+    if version is None:
+        version = session.info['sync_version'] = bump_counter(SYNC_COUNTER, session)
+    return version
+
+
+def mark_lookups_changed(session=None):
+    """Bump the lookups counter, once per transaction, after writing people or events"""
+    session = session or db.session
+    if not session.info.get('lookups_bumped'):
+        bump_counter(LOOKUP_COUNTER, session)
+        session.info['lookups_bumped'] = True
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _reset_sync_version(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('sync_version', None)
+        session.info.pop('lookups_bumped', None)
+
+
+@event.listens_for(Session, 'before_flush')
+def _stamp_sync_versions(session, flush_context, instances):
+    now = datetime.utcnow()
+    lookups_changed = False
+    for obj in list(session.new) + list(session.dirty):
+        if type(obj) in SYNCED_ENTITIES and (obj in session.new or session.is_modified(obj)):
+            obj.version = next_sync_version(session)
+            obj.updated_at = now
+            lookups_changed = lookups_changed or isinstance(obj, LOOKUP_MODELS)
+    for obj in list(session.deleted):
+        entity = SYNCED_ENTITIES.get(type(obj))
+        if entity:
+            lookups_changed = lookups_changed or isinstance(obj, LOOKUP_MODELS)
+            pk = db.inspect(obj).identity[0]
+            session.add(SyncTombstone(entity=entity, entity_id=pk, version=next_sync_version(session), deleted_at=now))
+    if lookups_changed:
+        mark_lookups_changed(session)
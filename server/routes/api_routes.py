@@ -1,7 +1,23 @@
 
-from flask import Blueprint, request, jsonify, current_app
-from models import Person, Event, Transaction, db
-from datetime import datetime
+from flask import Blueprint, Response, g, request, jsonify, current_app, stream_with_context
+from models import (
+    Person, Event, Transaction, TransactionArchive, SyncTombstone, PersonBalance, ARCHIVED_COLUMNS, MONEY,
+    SYNC_COUNTER, LOOKUP_COUNTER, current_counter, next_sync_version, refresh_person_balances, db
+)
+from sqlalchemy import Float, case, cast, delete, func, insert, literal, or_, select, tuple_, update
+from utils.db_routing import read_only
+from utils.http_cache import conditional_get
+from utils.importer import IMPORT_FORMATS, TransactionImporter, guess_import_format, read_records
+from utils.lookup_cache import lookup_cache
+from utils.money import MAX_MONEY, to_money
+from utils.pagination import encode_cursor, decode_cursor, encode_offset_cursor, decode_offset_cursor
+from utils.search import search_terms, search_transactions
+from utils.serializers import format_date, row_serializer
+from datetime import datetime, timedelta
+from functools import lru_cache
+from marshmallow import ValidationError, validate
+import csv
+import io
 import logging
 
 # Configure logging
@@ -10,24 +26,229 @@ logger = logging.getLogger(__name__)
 
 api_bp = Blueprint('api', __name__)
 
+# Listing helpers shared by the transaction list endpoints
+LISTING_MAX_LIMIT = 500
+
+# Money columns are cast to float in SQL, so the driver hands back floats
+# instead of Decimals that would each be converted in Python
+_TRANSACTION_FIELDS = {
+    'transaction_id': Transaction.transaction_id,
+    'person_id': Transaction.person_id,
+    'event_id': Transaction.event_id,
+    'amount': cast(Transaction.amount, Float),
+    'paid_amount': cast(Transaction.paid_amount, Float),
+    'reason': Transaction.reason,
+    'due_date': Transaction.due_date,
+    'status': Transaction.status,
+    'created_date': Transaction.created_date,
+}
+
+_NAME_FIELDS = {
+    'person_name': Person.person_name,
+    'event_name': Event.event_name,
+}
+
+# Field order of the GET /api/transactions payload
+_LISTING_FIELDS = {
+    name: {**_TRANSACTION_FIELDS, **_NAME_FIELDS}[name]
+    for name in (
+        'transaction_id', 'person_id', 'person_name', 'event_id', 'event_name', 'amount',
+        'paid_amount', 'reason', 'due_date', 'status', 'created_date',
+    )
+}
+
+_FIELD_FORMATTERS = {
+    'due_date': format_date,
+    'created_date': lambda v: format_date(v) if v else '',
+    'paid_amount': lambda v: v if v is not None else 0.0,
+    'event_name': lambda v: v if v is not None else 'N/A',
+}
+
+def _parse_bool_arg(name, value):
+    lowered = value.lower()
+    if lowered in ('true', '1', 'paid'):
+        return True
+    if lowered in ('false', '0', 'unpaid'):
+        return False
+    raise ValueError(f"Invalid {name}: {value}")
+
+def _parse_int_arg(name, value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {name}: {value}")
+
+def _parse_date_arg(name, value):
+    try:
+        return datetime.strptime(value, '%d-%m-%Y')
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {name} format. Use DD-MM-YYYY")
+
+def _transaction_query(field_map, fields):
+    """Select the given fields of field_map, joining person/event only when needed"""
+    query = db.session.query(*[field_map[f].label(f) for f in fields]).select_from(Transaction)
+    if 'person_name' in fields:
+        query = query.join(Person, Transaction.person_id == Person.person_id)
+    if 'event_name' in fields:
+        query = query.outerjoin(Event, Transaction.event_id == Event.event_id)
+    return query
+
+def _requested_fields(field_map):
+    """Fields named in the ``fields`` arg (comma separated), or all of field_map"""
+    fields = list(field_map)
+    if request.args.get('fields'):
+        fields = [f.strip() for f in request.args['fields'].split(',') if f.strip()]
+        unknown = [f for f in fields if f not in field_map]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+def _filter_transactions(query):
+    """Apply the status, person_id, event_id, due_from and due_to args"""
+    args = request.args
+    if args.get('status'):
+        query = query.filter(Transaction.status == _parse_bool_arg('status', args['status']))
+    if args.get('person_id'):
+        query = query.filter(Transaction.person_id == _parse_int_arg('person_id', args['person_id']))
+    if args.get('event_id'):
+        query = query.filter(Transaction.event_id == _parse_int_arg('event_id', args['event_id']))
+    if args.get('due_from'):
+        query = query.filter(Transaction.due_date >= _parse_date_arg('due_from', args['due_from']))
+    if args.get('due_to'):
+        query = query.filter(Transaction.due_date <= _parse_date_arg('due_to', args['due_to']))
+    return query
+
+@lru_cache(maxsize=256)
+def _row_serializer(fields):
+    return row_serializer(fields, _FIELD_FORMATTERS)
+
+def _iter_serialized(rows, fields):
+    # Rows from _transaction_query start with the requested fields in order
+    return map(_row_serializer(tuple(fields)), rows)
+
+def _serialize_rows(rows, fields):
+    return list(_iter_serialized(rows, fields))
+
+def _list_transactions(field_map, *criteria, order_by=Transaction.created_date):
+    """Serialize one keyset page of transactions according to the request args.
+
+    Rows matching criteria are ordered by (order_by, transaction_id),
+    oldest first. Supported args are
+    ``limit``, ``cursor``, ``fields`` (comma separated), ``status``,
+    ``person_id``, ``event_id``, ``due_from`` and ``due_to`` (DD-MM-YYYY,
+    inclusive). Without ``limit`` every matching row is returned. When more
+    rows remain, the token for the next page is sent in ``X-Next-Cursor``.
+    """
+    args = request.args
+    fields = _requested_fields(field_map)
+
+    limit = None
+    if args.get('limit'):
+        limit = _parse_int_arg('limit', args['limit'])
+        if not 1 <= limit <= LISTING_MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {LISTING_MAX_LIMIT}")
+
+    query = _transaction_query(field_map, fields).add_columns(
+        order_by.label('_cursor_key'),
+        Transaction.transaction_id.label('_cursor_id'),
+    ).filter(*criteria)
+
+    query = _filter_transactions(query)
+    if args.get('cursor'):
+        key, transaction_id = decode_cursor(args['cursor'])
+        # Row-value comparison lets the planner seek the (order_by, id) index,
+        # e.g. ix_transaction_created_date_id, and read the page in index order
+        query = query.filter(tuple_(order_by, Transaction.transaction_id) > (key, transaction_id))
+
+    query = query.order_by(order_by, Transaction.transaction_id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = query.all()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]._cursor_key, rows[-1]._cursor_id)
+
+    response = jsonify(_serialize_rows(rows, fields))
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
 # Debug endpoint to list all transaction IDs and details
 @api_bp.route('/transactions/debug/all', methods=['GET'])
+@read_only
+@conditional_get
 def debug_list_transactions():
-    transactions = Transaction.query.all()
-    result = []
-    for t in transactions:
-        result.append({
-            'transaction_id': t.transaction_id,
-            'person_id': t.person_id,
-            'event_id': t.event_id,
-            'amount': t.amount,
-            'paid_amount': t.paid_amount,
-            'reason': t.reason,
-            'due_date': t.due_date.strftime('%d-%m-%Y'),
-            'status': t.status,
-            'created_date': t.created_date.strftime('%d-%m-%Y') if t.created_date else '',
-        })
-    return jsonify(result)
+    try:
+        return _list_transactions(_TRANSACTION_FIELDS)
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+
+# Streaming export of the whole ledger
+EXPORT_CHUNK_ROWS = 1000
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+def _export_chunks(items, fields, fmt):
+    """Yield the export body, EXPORT_CHUNK_ROWS rows at a time"""
+    buffer = io.StringIO()
+    if fmt == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=fields, lineterminator='\n')
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        dumps = current_app.json.dumps
+        write = lambda item: buffer.write(dumps(item) + '\n')
+    for count, item in enumerate(items, 1):
+        write(item)
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@api_bp.route('/transactions/export', methods=['GET'])
+@read_only
+@conditional_get
+def export_transactions():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'msg': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    try:
+        fields = _requested_fields(_LISTING_FIELDS)
+        query = _filter_transactions(_transaction_query(_LISTING_FIELDS, fields))
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+
+    # yield_per fetches EXPORT_CHUNK_ROWS rows at a time (a server-side cursor
+    # on Postgres), so memory stays flat however big the ledger is. The query
+    # is executed here rather than in the generator so it still runs on the
+    # bind picked by @read_only.
+    rows = iter(query.order_by(Transaction.transaction_id).yield_per(EXPORT_CHUNK_ROWS))
+    body = _export_chunks(_iter_serialized(rows, fields), fields, fmt)
+    response = Response(stream_with_context(body), mimetype=EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename=transactions.{fmt}'
+    return response
+
+# Import a CSV/NDJSON file, either as the raw body or as the "file" form field
+@api_bp.route('/transactions/import', methods=['POST'])
+def import_transactions():
+    upload = request.files.get('file')
+    # LimitedStream splits lines in Python; buffering it reads them in C
+    stream = upload.stream if upload else io.BufferedReader(request.stream)
+    fmt = request.args.get('format') or (
+        guess_import_format(upload.filename, upload.mimetype) if upload
+        else guess_import_format(mimetype=request.mimetype)
+    )
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({'msg': f"format must be one of: {', '.join(IMPORT_FORMATS)}"}), 400
+
+    report = TransactionImporter().run(read_records(stream, fmt))
+    status_code = 201 if report['imported'] else 400
+    return jsonify({'msg': f"Imported {report['imported']} transactions", **report}), status_code
 
 # Update transaction status
 @api_bp.route('/transactions/<int:transaction_id>', methods=['PATCH'])
@@ -46,35 +267,126 @@ def update_transaction_status(transaction_id):
     return jsonify({'msg': 'Transaction status updated', 'transaction_id': transaction_id, 'status': transaction.status})
 
 # Clear all paid transactions from database
+CLEAR_PAID_BATCH_SIZE = 1000
+
+def _clear_paid_batch(archive):
+    """Delete (and optionally archive) up to CLEAR_PAID_BATCH_SIZE paid transactions"""
+    # Reserve the version first: every writer takes the change counter lock
+    # before any row lock (/pay, before_flush), and crossing that order
+    # deadlocks on Postgres
+    version = next_sync_version()
+    # Lock the chunk so the tombstoned/archived rows are exactly the deleted rows
+    rows = (db.session.query(Transaction.transaction_id, Transaction.person_id)
+            .filter(Transaction.status == True)
+            .order_by(Transaction.transaction_id)
+            .limit(CLEAR_PAID_BATCH_SIZE)
+            .with_for_update()
+            .all())
+    if not rows:
+        # Nothing changed, so don't publish the reserved version
+        db.session.rollback()
+        return 0
+    ids = [row.transaction_id for row in rows]
+    chunk = Transaction.transaction_id.in_(ids)
+    now = datetime.utcnow()
+    if archive:
+        db.session.execute(insert(TransactionArchive).from_select(
+            ARCHIVED_COLUMNS + ['archived_date'],
+            select(*[getattr(Transaction, c) for c in ARCHIVED_COLUMNS], literal(now))
+            .where(chunk),
+        ))
+    db.session.execute(insert(SyncTombstone).from_select(
+        ['entity', 'entity_id', 'version', 'deleted_at'],
+        select(literal('transaction'), Transaction.transaction_id, literal(version), literal(now))
+        .where(chunk),
+    ))
+    result = db.session.execute(
+        delete(Transaction).where(chunk).execution_options(synchronize_session=False)
+    )
+    refresh_person_balances(row.person_id for row in rows)
+    return result.rowcount
+
 @api_bp.route('/transactions/clear-paid', methods=['DELETE'])
 def clear_paid_transactions():
+    # ?archive=1 copies the rows into transaction_archive before deleting them
+    archive = request.args.get('archive', '').lower() in ('1', 'true')
+    deleted_count = 0
     try:
-        # Find all transactions with status = True (paid)
-        paid_transactions = Transaction.query.filter(Transaction.status == True).all()
-        deleted_count = len(paid_transactions)
-        
-        # Delete all paid transactions
-        for transaction in paid_transactions:
-            db.session.delete(transaction)
-        
-        db.session.commit()
-        
-        logger.info(f"Successfully deleted {deleted_count} paid transactions")
+        # Set-based deletes in fixed-size chunks, each committed on its own so
+        # a large backlog never holds one long transaction
+        while True:
+            batch_count = _clear_paid_batch(archive)
+            db.session.commit()
+            deleted_count += batch_count
+            if batch_count < CLEAR_PAID_BATCH_SIZE:
+                break
+
+        logger.info("Successfully deleted %d paid transactions (archive=%s)", deleted_count, archive)
         return jsonify({
             'msg': f'Successfully cleared {deleted_count} paid transactions',
-            'deleted_count': deleted_count
+            'deleted_count': deleted_count,
+            'archived': archive
         }), 200
         
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error clearing paid transactions: {str(e)}")
-        return jsonify({'msg': f'Error clearing paid transactions: {str(e)}'}), 500
+        return jsonify({
+            'msg': f'Error clearing paid transactions: {str(e)}',
+            'deleted_count': deleted_count
+        }), 500
 
 # People CRUD
+def _people_counter():
+    # Balances change with every transaction write, the plain list only
+    # with people writes
+    try:
+        with_balances = _parse_bool_arg('with_balances', request.args.get('with_balances', 'false'))
+    except ValueError:
+        with_balances = True  # answered with a 400 by the view
+    return SYNC_COUNTER if with_balances else LOOKUP_COUNTER
+
 @api_bp.route('/people', methods=['GET'])
+@read_only
+@conditional_get(counter=_people_counter)
 def get_people():
-    people = Person.query.all()
-    return jsonify([{'person_id': p.person_id, 'person_name': p.person_name} for p in people])
+    try:
+        with_balances = _parse_bool_arg('with_balances', request.args.get('with_balances', 'false'))
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+    if with_balances:
+        return jsonify(_people_with_balances())
+
+    # Tagged from the lookups counter: serve the rows of exactly that version
+    rows = lookup_cache.rows(Person, version=g.etag_version)
+    if rows is None:
+        rows = db.session.execute(select(Person.person_id, Person.person_name).order_by(Person.person_id))
+    return jsonify([{'person_id': person_id, 'person_name': name} for person_id, name in rows])
+
+def _people_with_balances():
+    # One row per person from the maintained person_balance table; people
+    # without transactions have no balance row
+    rows = db.session.execute(
+        select(
+            Person.person_id, Person.person_name,
+            cast(func.coalesce(PersonBalance.outstanding, 0), Float).label('outstanding'),
+            cast(func.coalesce(PersonBalance.paid_amount, 0), Float).label('paid_amount'),
+            func.coalesce(PersonBalance.transaction_count, 0).label('transaction_count'),
+            func.coalesce(PersonBalance.unpaid_count, 0).label('unpaid_count'),
+            PersonBalance.oldest_due_date,
+        )
+        .outerjoin(PersonBalance, PersonBalance.person_id == Person.person_id)
+        .order_by(Person.person_id)
+    )
+    return [{
+        'person_id': row.person_id,
+        'person_name': row.person_name,
+        'outstanding': row.outstanding,
+        'paid_amount': row.paid_amount,
+        'transaction_count': row.transaction_count,
+        'unpaid_count': row.unpaid_count,
+        'oldest_due_date': format_date(row.oldest_due_date) if row.oldest_due_date else None,
+    } for row in rows]
 
 @api_bp.route('/people', methods=['POST'])
 def add_person():
@@ -82,16 +394,27 @@ def add_person():
     name = data.get('person_name')
     if not name:
         return jsonify({'msg': 'Name required'}), 400
-    person = Person(person_name=name)
+    # Optional address for overdue reminder digests
+    email = data.get('email') or None
+    if email is not None:
+        try:
+            validate.Email()(email)
+        except ValidationError:
+            return jsonify({'msg': f'Invalid email: {email}'}), 400
+    person = Person(person_name=name, email=email)
     db.session.add(person)
     db.session.commit()
-    return jsonify({'person_id': person.person_id, 'person_name': person.person_name}), 201
+    return jsonify({'person_id': person.person_id, 'person_name': person.person_name, 'email': person.email}), 201
 
 # Events CRUD
 @api_bp.route('/events', methods=['GET'])
+@read_only
+@conditional_get(counter=LOOKUP_COUNTER)
 def get_events():
-    events = Event.query.all()
-    return jsonify([{'event_id': e.event_id, 'event_name': e.event_name} for e in events])
+    rows = lookup_cache.rows(Event, version=g.etag_version)
+    if rows is None:
+        rows = db.session.execute(select(Event.event_id, Event.event_name).order_by(Event.event_id))
+    return jsonify([{'event_id': event_id, 'event_name': name} for event_id, name in rows])
 
 @api_bp.route('/events', methods=['POST'])
 def add_event():
@@ -106,24 +429,152 @@ def add_event():
 
 # Transactions CRUD & History
 @api_bp.route('/transactions', methods=['GET'])
+@read_only
+@conditional_get
 def get_transactions():
-    transactions = Transaction.query.all()
-    result = []
-    for t in transactions:
-        result.append({
-            'transaction_id': t.transaction_id,
-            'person_id': t.person_id,
-            'person_name': t.person.person_name,
-            'event_id': t.event_id,
-            'event_name': getattr(t.event, 'event_name', 'N/A'),
-            'amount': t.amount,
-            'paid_amount': getattr(t, 'paid_amount', 0.0),
-            'reason': t.reason,
-            'due_date': t.due_date.strftime('%d-%m-%Y'),
-            'status': t.status,
-            'created_date': t.created_date.strftime('%d-%m-%Y') if hasattr(t, 'created_date') and t.created_date else '',
-        })
-    return jsonify(result)
+    # Person and event names are joined into the same statement, so a page
+    # costs one query regardless of size.
+    try:
+        return _list_transactions(_LISTING_FIELDS)
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+
+# Unpaid transactions by due date. Both lists are a range scan of
+# ix_transaction_status_due_date read in order, so their cost follows the
+# number of matching rows, not the table size. They get no ETag: the result
+# changes at midnight without any write.
+DUE_SOON_MAX_DAYS = 365
+
+def _start_of_today():
+    return datetime.combine(datetime.utcnow().date(), datetime.min.time())
+
+@api_bp.route('/transactions/overdue', methods=['GET'])
+@read_only
+def get_overdue_transactions():
+    try:
+        return _list_transactions(
+            _LISTING_FIELDS,
+            Transaction.status == False,
+            Transaction.due_date < _start_of_today(),
+            order_by=Transaction.due_date,
+        )
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+
+@api_bp.route('/transactions/due-soon', methods=['GET'])
+@read_only
+def get_due_soon_transactions():
+    try:
+        days = _parse_int_arg('days', request.args.get('days', '7'))
+        if not 0 <= days <= DUE_SOON_MAX_DAYS:
+            raise ValueError(f"days must be between 0 and {DUE_SOON_MAX_DAYS}")
+        today = _start_of_today()
+        return _list_transactions(
+            _LISTING_FIELDS,
+            Transaction.status == False,
+            Transaction.due_date >= today,
+            Transaction.due_date < today + timedelta(days=days + 1),
+            order_by=Transaction.due_date,
+        )
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+
+# Full-text search over reasons, person names and event names, best match
+# first. Relevance has no stable keyset, so pages are addressed by offset;
+# the match itself is answered from the FTS5 / GIN index (utils/search.py).
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+@api_bp.route('/search', methods=['GET'])
+@read_only
+@conditional_get
+def search():
+    try:
+        args = request.args
+        terms = search_terms(args.get('q'))
+        if not terms:
+            return jsonify({'msg': 'q must contain at least one word'}), 400
+        fields = _requested_fields(_LISTING_FIELDS)
+        limit = _parse_int_arg('limit', args.get('limit', str(SEARCH_DEFAULT_LIMIT)))
+        if not 1 <= limit <= SEARCH_MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {SEARCH_MAX_LIMIT}")
+        offset = decode_offset_cursor(args['cursor']) if args.get('cursor') else 0
+
+        query = _filter_transactions(_transaction_query(_LISTING_FIELDS, fields))
+        rows = search_transactions(query, terms).offset(offset).limit(limit + 1).all()
+
+        response = jsonify(_serialize_rows(rows[:limit], fields))
+        if len(rows) > limit:
+            response.headers['X-Next-Cursor'] = encode_offset_cursor(offset + limit)
+        return response
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+
+BULK_MAX_TRANSACTIONS = 500
+
+def _parse_transaction_payload(data):
+    """Validate one transaction payload and return the column values to insert.
+
+    Only checks the payload itself; whether person_id/event_id exist is left
+    to the caller so batches can check them with one query. Raises ValueError
+    with a client-facing message on invalid input.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Transaction must be a JSON object')
+
+    person_id = data.get('person_id')
+    event_id = data.get('event_id')
+    amount = data.get('amount')
+    reason = data.get('reason')
+    due_date = data.get('due_date')
+    status = data.get('status', False)
+    paid_amount = data.get('paid_amount', 0.0)
+
+    # Validate required fields
+    required_fields = {
+        'person_id': person_id,
+        'amount': amount,
+        'reason': reason,
+        'due_date': due_date
+    }
+
+    missing_fields = [field for field, value in required_fields.items() if not value and value != 0]
+    if missing_fields:
+        raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
+
+    try:
+        person_id = int(person_id)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid person_id: {person_id}")
+
+    if event_id is not None:
+        try:
+            event_id = int(event_id)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid event_id: {event_id}")
+
+    # Validate amounts, rounded to cents like the money columns
+    amount = to_money(amount)
+    if amount <= 0:
+        raise ValueError("Amount must be greater than 0")
+    paid_amount = to_money(paid_amount, 'paid_amount')
+
+    # Validate due_date
+    try:
+        due_date = datetime.strptime(due_date, '%d-%m-%Y')
+    except (ValueError, TypeError):
+        raise ValueError("Invalid due_date format. Use DD-MM-YYYY")
+
+    return {
+        'person_id': person_id,
+        'event_id': event_id,
+        'amount': amount,
+        'reason': str(reason).strip(),
+        'due_date': due_date,
+        'status': bool(status),
+        'paid_amount': paid_amount,
+        'created_date': datetime.utcnow(),
+    }
 
 @api_bp.route('/transactions', methods=['POST'])
 def add_transaction():
@@ -131,98 +582,36 @@ def add_transaction():
         data = request.json
         if not data:
             return jsonify({'msg': 'No data provided'}), 400
-            
-        logger.info(f"Received transaction data: {data}")
-        
-        # Extract and validate fields
-        person_id = data.get('person_id')
-        event_id = data.get('event_id')
-        amount = data.get('amount')
-        reason = data.get('reason')
-        due_date = data.get('due_date')
-        status = data.get('status', False)
-        paid_amount = data.get('paid_amount', 0.0)
-        
-        logger.info(f"Parsed fields: person_id={person_id}, event_id={event_id}, amount={amount}, due_date={due_date}")
-        
-        # Validate required fields
-        required_fields = {
-            'person_id': person_id,
-            'amount': amount,
-            'reason': reason,
-            'due_date': due_date
-        }
-        
-        missing_fields = [field for field, value in required_fields.items() if not value and value != 0]
-        if missing_fields:
-            error_msg = f"Missing required fields: {', '.join(missing_fields)}"
-            logger.error(error_msg)
-            return jsonify({'msg': error_msg}), 400
+
+        logger.debug("Received transaction data: %s", data)
 
         try:
-            person_id = int(person_id)
-        except (TypeError, ValueError):
-            error_msg = f"Invalid person_id: {person_id}"
-            logger.error(error_msg)
-            return jsonify({'msg': error_msg}), 400
-        
-        # Validate person exists
-        person = Person.query.get(person_id)
-        if not person:
-            error_msg = f"No person found with person_id: {person_id}"
+            values = _parse_transaction_payload(data)
+        except ValueError as e:
+            logger.error("Invalid transaction: %s", e)
+            return jsonify({'msg': str(e)}), 400
+
+        # Validate person exists; the cache only answers "yes", so ids it
+        # hasn't seen yet are still checked against the database
+        if not lookup_cache.has(Person, values['person_id']) and db.session.get(Person, values['person_id']) is None:
+            error_msg = f"No person found with person_id: {values['person_id']}"
             logger.error(error_msg)
             return jsonify({'msg': error_msg}), 404
 
         # Validate event if provided
-        if event_id is not None:
-            try:
-                event_id = int(event_id)
-                event = Event.query.get(event_id)
-                if not event:
-                    error_msg = f"No event found with event_id: {event_id}"
-                    logger.error(error_msg)
-                    return jsonify({'msg': error_msg}), 404
-            except (TypeError, ValueError):
-                error_msg = f"Invalid event_id: {event_id}"
-                logger.error(error_msg)
-                return jsonify({'msg': error_msg}), 400
-
-        # Validate amount
-        try:
-            amount = float(amount)
-            if amount <= 0:
-                error_msg = "Amount must be greater than 0"
-                logger.error(error_msg)
-                return jsonify({'msg': error_msg}), 400
-        except (TypeError, ValueError):
-            error_msg = f"Invalid amount: {amount}"
-            logger.error(error_msg)
-            return jsonify({'msg': error_msg}), 400
-
-        # Validate due_date
-        try:
-            due_date = datetime.strptime(due_date, '%d-%m-%Y')
-        except (ValueError, TypeError):
-            error_msg = f"Invalid due_date format. Use DD-MM-YYYY"
+        if (values['event_id'] is not None and not lookup_cache.has(Event, values['event_id'])
+                and db.session.get(Event, values['event_id']) is None):
+            error_msg = f"No event found with event_id: {values['event_id']}"
             logger.error(error_msg)
-            return jsonify({'msg': error_msg}), 400
+            return jsonify({'msg': error_msg}), 404
 
         # Create transaction
-        transaction = Transaction(
-            person_id=person_id,
-            event_id=event_id,
-            amount=amount,
-            reason=reason.strip(),
-            due_date=due_date,
-            status=bool(status),
-            paid_amount=float(paid_amount),
-            created_date=datetime.utcnow()
-        )
+        transaction = Transaction(**values)
 
         db.session.add(transaction)
         db.session.commit()
         
-        logger.info(f"Transaction created successfully: {transaction.transaction_id}")
+        logger.info("Transaction created successfully: %s", transaction.transaction_id)
         return jsonify({
             'transaction_id': transaction.transaction_id,
             'msg': 'Transaction created successfully'
@@ -234,6 +623,194 @@ def add_transaction():
         db.session.rollback()
         return jsonify({'msg': error_msg}), 500
 
+# Bulk create, e.g. a bill split across several people
+@api_bp.route('/transactions/bulk', methods=['POST'])
+def add_transactions_bulk():
+    data = request.json
+    items = data.get('transactions') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({'msg': 'Provide a non-empty list of transactions'}), 400
+    if len(items) > BULK_MAX_TRANSACTIONS:
+        return jsonify({'msg': f'At most {BULK_MAX_TRANSACTIONS} transactions per request'}), 400
+
+    errors = []
+    parsed = []
+    for index, item in enumerate(items):
+        try:
+            parsed.append((index, _parse_transaction_payload(item)))
+        except ValueError as e:
+            errors.append({'index': index, 'msg': str(e)})
+
+    # Ids the lookup cache doesn't know get one existence query per table
+    person_ids = {values['person_id'] for _, values in parsed
+                  if not lookup_cache.has(Person, values['person_id'])}
+    event_ids = {values['event_id'] for _, values in parsed
+                 if values['event_id'] is not None and not lookup_cache.has(Event, values['event_id'])}
+    known_people = set(db.session.scalars(
+        select(Person.person_id).where(Person.person_id.in_(person_ids))
+    )) if person_ids else set()
+    known_events = set(db.session.scalars(
+        select(Event.event_id).where(Event.event_id.in_(event_ids))
+    )) if event_ids else set()
+
+    valid = []
+    for index, values in parsed:
+        if values['person_id'] in person_ids and values['person_id'] not in known_people:
+            errors.append({'index': index, 'msg': f"No person found with person_id: {values['person_id']}"})
+        elif values['event_id'] in event_ids and values['event_id'] not in known_events:
+            errors.append({'index': index, 'msg': f"No event found with event_id: {values['event_id']}"})
+        else:
+            valid.append((index, values))
+    errors.sort(key=lambda error: error['index'])
+
+    if not valid:
+        return jsonify({'msg': 'No transactions created', 'created': [], 'errors': errors}), 400
+
+    try:
+        version = next_sync_version()
+        now = datetime.utcnow()
+        # One batched INSERT ... RETURNING for the whole batch on Postgres.
+        # SQLite can't guarantee RETURNING order for a multi-row insert, so
+        # there SQLAlchemy falls back to one statement per row.
+        transaction_ids = db.session.scalars(
+            insert(Transaction).returning(Transaction.transaction_id, sort_by_parameter_order=True),
+            [{**values, 'version': version, 'updated_at': now} for _, values in valid],
+        ).all()
+        refresh_person_balances(values['person_id'] for _, values in valid)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error("Error creating transactions in bulk: %s", e)
+        return jsonify({'msg': f'Error creating transactions: {str(e)}'}), 500
+
+    created = [
+        {'index': index, 'transaction_id': transaction_id}
+        for (index, _), transaction_id in zip(valid, transaction_ids)
+    ]
+    logger.info("Bulk created %d transactions (%d rejected)", len(created), len(errors))
+    return jsonify({
+        'msg': f'Created {len(created)} transactions',
+        'created': created,
+        'errors': errors
+    }), 201
+
+# Dashboard totals, aggregated in SQL
+def _money_sum(expr):
+    # Exact on Postgres' numeric; the round() drops the float noise SQLite's
+    # REAL storage adds to the sum
+    return func.round(func.coalesce(func.sum(expr), 0), 2)
+
+def _summary_columns():
+    outstanding = case(
+        (Transaction.status == False, Transaction.amount - Transaction.paid_amount),
+        else_=0,
+    )
+    return [
+        func.count(Transaction.transaction_id).label('count'),
+        _money_sum(Transaction.amount).label('amount'),
+        _money_sum(Transaction.paid_amount).label('paid_amount'),
+        _money_sum(outstanding).label('outstanding'),
+    ]
+
+def _summary_totals(row):
+    return {
+        'count': row.count,
+        'amount': float(row.amount),
+        'paid_amount': float(row.paid_amount),
+        'outstanding': float(row.outstanding),
+    }
+
+@api_bp.route('/summary', methods=['GET'])
+@read_only
+@conditional_get
+def get_summary():
+    by_status = {'paid': None, 'unpaid': None}
+    for row in db.session.query(Transaction.status, *_summary_columns()).group_by(Transaction.status):
+        by_status['paid' if row.status else 'unpaid'] = _summary_totals(row)
+    empty = {'count': 0, 'amount': 0.0, 'paid_amount': 0.0, 'outstanding': 0.0}
+    by_status = {key: value or dict(empty) for key, value in by_status.items()}
+    totals = _summary_totals(db.session.query(*_summary_columns()).one())
+
+    by_person = [
+        {'person_id': row.person_id, 'person_name': row.person_name, **_summary_totals(row)}
+        for row in db.session.query(Transaction.person_id, Person.person_name, *_summary_columns())
+        .join(Person, Transaction.person_id == Person.person_id)
+        .group_by(Transaction.person_id, Person.person_name)
+        .order_by(Person.person_name)
+    ]
+
+    by_event = [
+        {
+            'event_id': row.event_id,
+            'event_name': row.event_name if row.event_name is not None else 'N/A',
+            **_summary_totals(row),
+        }
+        for row in db.session.query(Transaction.event_id, Event.event_name, *_summary_columns())
+        .outerjoin(Event, Transaction.event_id == Event.event_id)
+        .group_by(Transaction.event_id, Event.event_name)
+        .order_by(Event.event_name)
+    ]
+
+    return jsonify({
+        'totals': totals,
+        'by_status': by_status,
+        'by_person': by_person,
+        'by_event': by_event
+    })
+
+# Incremental sync: everything that changed since a previous token
+@api_bp.route('/sync', methods=['GET'])
+@read_only
+def sync_changes():
+    since = request.args.get('since')
+    if since:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({'msg': f'Invalid since token: {since}'}), 400
+    else:
+        since = None
+
+    # Anything with version <= token was committed before we read the counter,
+    # so the next sync from this token can't miss a row
+    token = current_counter(SYNC_COUNTER)
+
+    def changed(model):
+        if since is None:
+            return model.version <= token
+        return model.version.between(since + 1, token)
+
+    people = [
+        {'person_id': person_id, 'person_name': name}
+        for person_id, name in db.session.query(Person.person_id, Person.person_name).filter(changed(Person))
+    ]
+    events = [
+        {'event_id': event_id, 'event_name': name}
+        for event_id, name in db.session.query(Event.event_id, Event.event_name).filter(changed(Event))
+    ]
+    fields = list(_LISTING_FIELDS)
+    transactions = _serialize_rows(
+        _transaction_query(_LISTING_FIELDS, fields).filter(changed(Transaction))
+        .order_by(Transaction.created_date, Transaction.transaction_id),
+        fields,
+    )
+
+    deleted = {'people': [], 'events': [], 'transactions': []}
+    if since is not None:
+        keys = {'person': 'people', 'event': 'events', 'transaction': 'transactions'}
+        for tombstone in db.session.query(SyncTombstone.entity, SyncTombstone.entity_id) \
+                .filter(SyncTombstone.version.between(since + 1, token)):
+            deleted[keys[tombstone.entity]].append(tombstone.entity_id)
+
+    return jsonify({
+        'token': token,
+        'full': since is None,
+        'people': people,
+        'events': events,
+        'transactions': transactions,
+        'deleted': deleted
+    })
+
 # Partial Payment
 @api_bp.route('/transactions/<int:transaction_id>/pay', methods=['POST'])
 def partial_payment(transaction_id):
@@ -241,13 +818,41 @@ def partial_payment(transaction_id):
     data = request.json
     amount = data.get('amount')
     logging.warning(f"POST /transactions/{transaction_id}/pay called with amount={amount}")
-    transaction = Transaction.query.get(transaction_id)
-    if not transaction:
+    try:
+        amount = to_money(amount)
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+    if amount <= 0:
+        return jsonify({'msg': 'Amount must be greater than 0'}), 400
+
+    # Apply the payment in one atomic UPDATE so concurrent /pay calls can't
+    # lose an increment. SET expressions see the pre-update row values.
+    # Rounding to cents keeps repeated fractional payments from drifting
+    # below the amount on databases without exact numerics (SQLite).
+    new_paid_amount = func.round(Transaction.paid_amount + literal(amount, MONEY), 2)
+    row = db.session.execute(
+        update(Transaction)
+        .where(Transaction.transaction_id == transaction_id)
+        # The total must still fit the money columns (Postgres would raise
+        # numeric field overflow, SQLite would store it anyway)
+        .where(new_paid_amount <= literal(MAX_MONEY, MONEY))
+        .values(
+            paid_amount=new_paid_amount,
+            status=or_(Transaction.status, new_paid_amount >= Transaction.amount),
+            version=next_sync_version(),
+            updated_at=datetime.utcnow(),
+        )
+        .returning(Transaction.paid_amount, Transaction.status, Transaction.person_id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        db.session.rollback()
+        if db.session.get(Transaction, transaction_id) is not None:
+            return jsonify({'msg': f'paid_amount must not exceed {MAX_MONEY}'}), 400
         logging.error(f"Transaction {transaction_id} not found for partial payment")
         return jsonify({'msg': 'Transaction not found'}), 404
-    transaction.paid_amount = getattr(transaction, 'paid_amount', 0.0) + amount
-    if transaction.paid_amount >= transaction.amount:
-        transaction.status = True
+    refresh_person_balances([row.person_id])
     db.session.commit()
-    logging.info(f"Transaction {transaction_id} paid_amount updated to {transaction.paid_amount}, status={transaction.status}")
-    return jsonify({'msg': 'Payment updated', 'paid_amount': transaction.paid_amount, 'status': transaction.status})
+    paid_amount, status = float(row.paid_amount), bool(row.status)
+    logging.info(f"Transaction {transaction_id} paid_amount updated to {paid_amount}, status={status}")
+    return jsonify({'msg': 'Payment updated', 'paid_amount': paid_amount, 'status': status})
@@ -7,8 +7,8 @@ from flask_jwt_extended import (
     get_jwt_identity
 )
 from models import User, db
-from extensions import mail, limiter
-from flask_mail import Message
+from extensions import limiter
+from utils.mail_outbox import enqueue_mail, outbox
 from utils.schemas import LoginSchema, OtpRequestSchema, OtpVerifySchema
 from utils.security import validate_json
 import random
@@ -45,6 +45,12 @@ def login():
     if not user or not user.check_mPin(mPin):
         return jsonify({'msg': 'Invalid email or PIN'}), 401
 
+    # Upgrade (or downgrade) the stored hash to the configured cost while we
+    # still have the plain MPIN
+    if user.mPin_needs_rehash():
+        user.set_mPin(mPin)
+        db.session.commit()
+
     access_token = create_access_token(identity=user.id)
     refresh_token = create_refresh_token(identity=user.id)
 
@@ -72,15 +78,17 @@ def request_otp():
     otp = '{:06d}'.format(random.randint(0, 999999))
     user.otp = otp
     user.otp_expiry = datetime.utcnow() + timedelta(minutes=10)
-    db.session.commit()
 
-    msg = Message(
+    # Queued in the same transaction as the OTP; the outbox sends it in the
+    # background so the request doesn't wait on SMTP
+    enqueue_mail(
         subject='Your OTP for MPIN Reset',
         sender='kosu.studies@gmail.com',
         recipients=[email],
         body=f'Your OTP is: {otp}. It will expire in 10 minutes.'
     )
-    mail.send(msg)
+    db.session.commit()
+    outbox.wake()
 
     return jsonify({'msg': 'OTP sent to email'}), 200
 
@@ -0,0 +1,37 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import TestingConfig
+from extensions import db
+from utils.compression import compression
+from utils.lookup_cache import lookup_cache
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """The app on a fresh file-backed SQLite database, with an app context pushed"""
+    # A file, not :memory:, so connections from other threads see the same data
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    # The default "50 per hour" limit would trip in the load tests
+    monkeypatch.setattr(TestingConfig, 'RATELIMIT_ENABLED', False, raising=False)
+    # Tests drive the outbox themselves instead of a background thread
+    monkeypatch.setattr(TestingConfig, 'MAIL_OUTBOX_WORKER', 'external', raising=False)
+
+    app = create_app('testing')
+    # Per-process caches outlive an app; don't carry rows over between tests
+    lookup_cache.invalidate()
+    compression.clear()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,38 @@
+def add_transaction(client):
+    response = client.post('/api/transactions', json={
+        'person_id': 1, 'amount': 5, 'reason': 'lunch', 'due_date': '01-01-2030',
+    })
+    assert response.status_code == 201
+    return response.json['transaction_id']
+
+
+def pay_and_clear(client, transaction_id):
+    assert client.post(f'/api/transactions/{transaction_id}/pay', json={'amount': 5}).status_code == 200
+    response = client.delete('/api/transactions/clear-paid?archive=1')
+    assert response.status_code == 200
+    assert response.json['deleted_count'] == 1
+
+
+def test_archived_ids_are_not_reused(client):
+    client.post('/api/people', json={'person_name': 'payer'})
+    add_transaction(client)
+    first = add_transaction(client)
+    pay_and_clear(client, first)
+
+    second = add_transaction(client)
+    assert second > first
+    pay_and_clear(client, second)
+
+    deleted = client.get('/api/sync?since=0').json['deleted']['transactions']
+    assert sorted(deleted) == [first, second]
+
+
+def test_nothing_to_clear_keeps_the_sync_version(client):
+    client.post('/api/people', json={'person_name': 'payer'})
+    add_transaction(client)
+    token = client.get('/api/sync?since=0').json['token']
+
+    response = client.delete('/api/transactions/clear-paid')
+
+    assert response.json['deleted_count'] == 0
+    assert client.get('/api/sync?since=0').json['token'] == token
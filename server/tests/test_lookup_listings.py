@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import event, text
+from config import TestingConfig
+from extensions import db
+from utils.db_routing import STICKY_COOKIE
+
+
+def write_from_another_worker(statement):
+    # Straight to the database, so this process's cache isn't told
+    with db.engine.begin() as connection:
+        connection.execute(text(statement))
+        connection.execute(text("UPDATE change_counter SET value = value + 1 WHERE name IN ('sync', 'lookups')"))
+
+
+def test_people_listing_matches_its_etag(client):
+    client.post('/api/people', json={'person_name': 'first'})
+    stale = client.get('/api/people')
+    assert [p['person_name'] for p in stale.json] == ['first']
+
+    write_from_another_worker("INSERT INTO person (person_name) VALUES ('second')")
+    response = client.get('/api/people', headers={'If-None-Match': stale.headers['ETag']})
+
+    assert response.status_code == 200
+    assert [p['person_name'] for p in response.json] == ['first', 'second']
+
+
+def test_events_listing_matches_its_etag(client):
+    client.post('/api/events', json={'event_name': 'first'})
+    assert len(client.get('/api/events').json) == 1
+
+    write_from_another_worker("INSERT INTO event (event_name) VALUES ('second')")
+
+    assert [e['event_name'] for e in client.get('/api/events').json] == ['first', 'second']
+
+
+@pytest.fixture
+def replica_app(request, tmp_path, monkeypatch):
+    # The replica is the same file, so what differs is only which engine is used
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_BINDS',
+                        {'replica': f"sqlite:///{tmp_path / 'test.db'}"}, raising=False)
+    yield request.getfixturevalue('app')
+    # init_app registered a metadata for the bind on the shared db object
+    db.metadatas.pop('replica', None)
+
+
+def record_statements(engine):
+    statements = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+
+@pytest.mark.parametrize('url', ['/api/people', '/api/events'])
+def test_cached_listing_reads_only_the_counter_from_the_replica(replica_app, url):
+    client = replica_app.test_client()
+    client.post(url, json={'person_name': 'first', 'event_name': 'first'})
+    client.delete_cookie(STICKY_COOKIE)  # the write pinned this client to the primary
+    assert client.get(url).status_code == 200  # fills the cache
+
+    primary = record_statements(db.engine)
+    replica = record_statements(db.engines['replica'])
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert len(response.json) == 1
+    assert primary == []
+    assert len(replica) == 1, replica
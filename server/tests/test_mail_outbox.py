@@ -0,0 +1,115 @@
+import socket
+import time
+from datetime import datetime, timedelta
+import pytest
+from aiosmtpd.controller import Controller
+from extensions import db, mail
+from models import OutboxMessage, User
+from utils.mail_outbox import outbox
+
+
+class RecordingHandler:
+    """aiosmtpd handler keeping every received mail with the connection it came on"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((session.peer, envelope.rcpt_tos, envelope.content.decode('utf-8')))
+        return '250 OK'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def use_smtp(app, port):
+    app.config.update(
+        MAIL_SERVER='127.0.0.1', MAIL_PORT=port, MAIL_USE_TLS=False, MAIL_USE_SSL=False,
+        MAIL_USERNAME=None, MAIL_PASSWORD=None, MAIL_SUPPRESS_SEND=False,
+    )
+    mail.init_app(app)
+
+
+def add_users(client, count):
+    emails = [f'user{i}@example.com' for i in range(count)]
+    for email in emails:
+        response = client.post('/auth/signup', json={'username': email, 'email': email, 'mPin': '1234'})
+        assert response.status_code == 201
+    return emails
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def test_otp_mails_are_sent_over_one_connection(app, client, smtp_server):
+    controller, handler = smtp_server
+    use_smtp(app, controller.port)
+    emails = add_users(client, 3)
+
+    for email in emails:
+        response = client.post('/auth/request-otp', json={'email': email})
+        assert response.status_code == 200
+    # Nothing is sent inside the request
+    assert handler.messages == []
+
+    outbox.drain()
+
+    assert sorted(rcpts[0] for _, rcpts, _ in handler.messages) == emails
+    assert len({peer for peer, _, _ in handler.messages}) == 1
+    for _, rcpts, content in handler.messages:
+        otp = User.query.filter_by(email=rcpts[0]).one().otp
+        assert f'Your OTP is: {otp}.' in content
+    assert {m.status for m in OutboxMessage.query.all()} == {'sent'}
+
+
+def test_refused_connection_is_retried_with_backoff(app, client):
+    use_smtp(app, free_port())  # nothing listens there
+    [email] = add_users(client, 1)
+    assert client.post('/auth/request-otp', json={'email': email}).status_code == 200
+    retry = app.config['MAIL_OUTBOX_RETRY_SECONDS']
+
+    delays = []
+    for attempt in (1, 2):
+        before = datetime.utcnow()
+        assert outbox.send_pending() == 1
+        message = OutboxMessage.query.one()
+        assert message.status == 'pending'
+        assert message.attempts == attempt
+        assert message.last_error
+        delays.append(message.next_attempt_at - before)
+        # Make it due again without waiting out the backoff
+        message.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+    assert timedelta(seconds=retry) <= delays[0] < timedelta(seconds=retry + 5)
+    assert timedelta(seconds=2 * retry) <= delays[1] < timedelta(seconds=2 * retry + 5)
+
+
+def test_claims_outlast_a_slow_batch(app, client, monkeypatch):
+    [email] = add_users(client, 1)
+    for _ in range(3):
+        assert client.post('/auth/request-otp', json={'email': email}).status_code == 200
+    monkeypatch.setattr(outbox, 'CLAIM_SECONDS', 1)
+    deliver = outbox._deliver
+    claims_left = []
+
+    def slow_deliver(message):
+        # What another worker would see: is the claim still hiding the row?
+        claims_left.append(message.next_attempt_at - datetime.utcnow())
+        time.sleep(0.6)
+        deliver(message)
+
+    monkeypatch.setattr(outbox, '_deliver', slow_deliver)
+    assert outbox.send_pending() == 3
+
+    assert len(claims_left) == 3
+    assert all(left > timedelta(seconds=0.5) for left in claims_left), claims_left
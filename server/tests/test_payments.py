@@ -0,0 +1,58 @@
+import threading
+from datetime import datetime
+from extensions import db
+from models import Person, Transaction
+
+THREADS = 8
+PAYMENTS_PER_THREAD = 25
+
+
+def test_concurrent_payments_lose_no_increment(app):
+    person = Person(person_name='payer')
+    db.session.add(person)
+    db.session.flush()
+    transaction = Transaction(person_id=person.person_id, amount=20, reason='dinner',
+                              due_date=datetime(2030, 1, 1))
+    db.session.add(transaction)
+    db.session.commit()
+    transaction_id = transaction.transaction_id
+    db.session.remove()
+
+    start = threading.Barrier(THREADS)
+    statuses = []
+
+    def pay():
+        client = app.test_client()
+        start.wait()
+        for _ in range(PAYMENTS_PER_THREAD):
+            response = client.post(f'/api/transactions/{transaction_id}/pay', json={'amount': '0.10'})
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=pay) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [200] * (THREADS * PAYMENTS_PER_THREAD)
+    paid_amount, status = db.session.execute(
+        db.select(Transaction.paid_amount, Transaction.status)
+        .where(Transaction.transaction_id == transaction_id)
+    ).one()
+    # 200 payments of 0.10, exactly
+    assert paid_amount == 20.00
+    assert status is True
+
+
+def test_payment_overflowing_paid_amount_is_rejected(client):
+    client.post('/api/people', json={'person_name': 'payer'})
+    client.post('/api/transactions', json={
+        'person_id': 1, 'amount': 9999999999, 'reason': 'house', 'due_date': '01-01-2030',
+    })
+
+    assert client.post('/api/transactions/1/pay', json={'amount': 9999999999}).status_code == 200
+    response = client.post('/api/transactions/1/pay', json={'amount': 9999999999})
+
+    assert response.status_code == 400
+    assert db.session.get(Transaction, 1).paid_amount == 9999999999
+    assert client.post('/api/transactions/2/pay', json={'amount': 1}).status_code == 404
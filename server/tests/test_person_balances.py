@@ -0,0 +1,87 @@
+import json
+from collections import defaultdict
+from sqlalchemy import select
+from extensions import db
+from models import Transaction
+from utils.serializers import format_date
+
+
+def expected_balances():
+    """The balances recomputed in Python from the transaction table"""
+    balances = defaultdict(lambda: {
+        'outstanding': 0.0, 'paid_amount': 0.0, 'transaction_count': 0, 'unpaid_count': 0,
+        'oldest_due_date': None,
+    })
+    rows = db.session.execute(select(
+        Transaction.person_id, Transaction.amount, Transaction.paid_amount, Transaction.status,
+        Transaction.due_date,
+    ))
+    for person_id, amount, paid_amount, status, due_date in rows:
+        balance = balances[person_id]
+        balance['paid_amount'] += float(paid_amount)
+        balance['transaction_count'] += 1
+        if not status:
+            balance['outstanding'] += float(amount - paid_amount)
+            balance['unpaid_count'] += 1
+            if balance['oldest_due_date'] is None or due_date < balance['oldest_due_date']:
+                balance['oldest_due_date'] = due_date
+    for balance in balances.values():
+        balance['outstanding'] = round(balance['outstanding'], 2)
+        balance['paid_amount'] = round(balance['paid_amount'], 2)
+        if balance['oldest_due_date'] is not None:
+            balance['oldest_due_date'] = format_date(balance['oldest_due_date'])
+    return balances
+
+
+def assert_balances_match(client):
+    expected = expected_balances()
+    people = client.get('/api/people?with_balances=true').json
+    assert people
+    for person in people:
+        assert {key: person[key] for key in expected[person['person_id']]} == expected[person['person_id']], person
+
+
+def test_balances_follow_every_write_path(client):
+    for name in ('alice', 'bob', 'carol'):
+        client.post('/api/people', json={'person_name': name})
+    client.post('/api/events', json={'event_name': 'trip'})
+
+    def add(person_id, amount, due_date, **extra):
+        response = client.post('/api/transactions', json={
+            'person_id': person_id, 'amount': amount, 'reason': 'dinner', 'due_date': due_date, **extra,
+        })
+        assert response.status_code == 201
+        return response.json['transaction_id']
+
+    first = add(1, 30, '05-03-2030', event_id=1)
+    second = add(1, 12.5, '01-02-2030')
+    third = add(2, 40, '10-01-2030')
+    assert_balances_match(client)
+
+    response = client.post('/api/transactions/bulk', json=[
+        {'person_id': 2, 'amount': 8, 'reason': 'taxi', 'due_date': '01-01-2030'},
+        {'person_id': 3, 'amount': 20, 'reason': 'tickets', 'due_date': '15-06-2030', 'event_id': 1},
+    ])
+    assert response.status_code == 201
+    assert_balances_match(client)
+
+    body = '\n'.join(json.dumps(record) for record in [
+        {'person_name': 'alice', 'amount': 5, 'reason': 'coffee', 'due_date': '20-12-2029'},
+        {'person_name': 'carol', 'amount': 7.25, 'reason': 'snacks', 'due_date': '02-02-2030'},
+        # A person the import creates
+        {'person_name': 'dave', 'amount': 3, 'reason': 'bus', 'due_date': '03-03-2030', 'status': True},
+    ])
+    response = client.post('/api/transactions/import?format=ndjson', data=body,
+                           content_type='application/x-ndjson')
+    assert response.status_code == 201
+    assert_balances_match(client)
+
+    assert client.post(f'/api/transactions/{first}/pay', json={'amount': 10}).status_code == 200
+    assert client.post(f'/api/transactions/{third}/pay', json={'amount': 40}).status_code == 200
+    assert_balances_match(client)
+
+    assert client.patch(f'/api/transactions/{second}', json={'status': True}).status_code == 200
+    assert_balances_match(client)
+
+    assert client.delete('/api/transactions/clear-paid').json['deleted_count'] == 3
+    assert_balances_match(client)
@@ -0,0 +1,41 @@
+import multiprocessing
+import pytest
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter
+import utils.limiter_storage  # registers the sqlite:// storage
+
+PROCESSES = 4
+HITS_PER_PROCESS = 5
+STRATEGIES = {
+    'fixed-window': FixedWindowRateLimiter,
+    'moving-window': MovingWindowRateLimiter,
+}
+
+
+def hit_from_process(uri, strategy, start, results):
+    # Like a gunicorn worker: its own storage object on the shared file
+    limiter = STRATEGIES[strategy](storage_from_string(uri))
+    limit = parse('5/minute')
+    start.wait()
+    results.put([limiter.hit(limit, 'login', '203.0.113.7') for _ in range(HITS_PER_PROCESS)])
+
+
+@pytest.mark.parametrize('strategy', STRATEGIES)
+def test_processes_share_one_limit(tmp_path, strategy):
+    uri = f"sqlite:///{tmp_path / 'ratelimits.db'}"
+    storage_from_string(uri)  # create the tables before the race
+    ctx = multiprocessing.get_context('spawn')
+    start = ctx.Event()
+    results = ctx.Queue()
+    processes = [ctx.Process(target=hit_from_process, args=(uri, strategy, start, results))
+                 for _ in range(PROCESSES)]
+    for process in processes:
+        process.start()
+    start.set()
+    hits = [hit for _ in processes for hit in results.get(timeout=30)]
+    for process in processes:
+        process.join(timeout=30)
+
+    assert len(hits) == PROCESSES * HITS_PER_PROCESS
+    assert hits.count(True) == 5
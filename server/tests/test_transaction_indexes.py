@@ -0,0 +1,53 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import select, text
+from extensions import db
+from models import Transaction
+
+# The filters the API runs against transaction, and the index SQLite must use
+QUERIES = {
+    # DELETE /api/transactions/clear-paid, one chunk
+    'clear-paid': (
+        select(Transaction.transaction_id, Transaction.person_id)
+        .where(Transaction.status == True)
+        .order_by(Transaction.transaction_id)
+        .limit(1000),
+        'ix_transaction_status_due_date',
+    ),
+    # ?person_id= (with and without ?status=)
+    'per-person': (
+        select(Transaction.transaction_id).where(Transaction.person_id == 1),
+        'ix_transaction_person_id_status',
+    ),
+    'per-person-unpaid': (
+        select(Transaction.transaction_id).where(Transaction.person_id == 1, Transaction.status == False),
+        'ix_transaction_person_id_status',
+    ),
+    # ?event_id=
+    'per-event': (
+        select(Transaction.transaction_id).where(Transaction.event_id == 1),
+        'ix_transaction_event_id',
+    ),
+    # /api/transactions/overdue and the reminder digests
+    'unpaid-by-due-date': (
+        select(Transaction.transaction_id)
+        .where(Transaction.status == False, Transaction.due_date < datetime(2030, 1, 1))
+        .order_by(Transaction.due_date, Transaction.transaction_id),
+        'ix_transaction_status_due_date',
+    ),
+}
+
+
+def query_plan(statement):
+    sql = str(statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    return [row[3] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+
+
+@pytest.mark.parametrize('name', QUERIES)
+def test_query_uses_index(app, name):
+    statement, index = QUERIES[name]
+
+    plan = query_plan(statement)
+
+    assert any(f'INDEX {index} ' in step for step in plan), plan
+    assert not any(step.startswith('SCAN transaction') for step in plan), plan
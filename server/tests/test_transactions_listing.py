@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from extensions import db
+from models import Person, Event, Transaction
+
+
+def add_transactions(count):
+    people = [Person(person_name=f'person {i}') for i in range(3)]
+    events = [Event(event_name=f'event {i}') for i in range(2)]
+    db.session.add_all(people + events)
+    db.session.flush()
+    db.session.add_all(
+        Transaction(
+            person_id=people[i % 3].person_id,
+            event_id=events[i % 2].event_id if i % 3 else None,
+            amount=10 + i,
+            reason=f'reason {i}',
+            due_date=datetime(2030, 1, 1) + timedelta(days=i),
+        )
+        for i in range(count)
+    )
+    db.session.commit()
+
+
+def count_statements(client, url):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    return response, statements
+
+
+@pytest.mark.parametrize('count', [1, 20, 200])
+def test_listing_does_not_query_per_row(client, count):
+    add_transactions(count)
+
+    response, statements = count_statements(client, '/api/transactions')
+
+    assert len(response.json) == count
+    # The sync counter read for the ETag, then one joined listing query
+    assert len(statements) == 2, statements
+    assert all(row['person_name'].startswith('person ') for row in response.json)
+    assert {row['event_name'] for row in response.json} <= {'event 0', 'event 1', 'N/A'}
@@ -71,7 +71,8 @@ transaction_model = api.model('Transaction', {
 
 person_model = api.model('Person', {
     'person_id': fields.Integer(description='Person ID'),
-    'person_name': fields.String(required=True, description='Person name')
+    'person_name': fields.String(required=True, description='Person name'),
+    'email': fields.String(description='Address for overdue reminder digests')
 })
 
 event_model = api.model('Event', {
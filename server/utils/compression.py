@@ -0,0 +1,110 @@
+import gzip
+import threading
+from collections import OrderedDict
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional; only gzip is offered without it
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = (
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/html', 'text/plain',
+)
+
+
+class ResponseCompressor:
+    """Compress response bodies with brotli or gzip, as Accept-Encoding allows.
+
+    Only complete 200 bodies of at least COMPRESS_MIN_SIZE bytes are
+    compressed; streamed responses such as the export are sent as they
+    are. GETs with an ETag (see utils/http_cache.py) keep their compressed
+    body in a per-process LRU keyed by (ETag, URL, encoding), up to
+    COMPRESS_CACHE_BYTES in total, so an unchanged ledger is compressed
+    once rather than once per client.
+    """
+
+    def __init__(self, app=None):
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_quality = 5
+        self.cache_bytes = 16 * 1024 * 1024
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.min_size = app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        self.gzip_level = app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+        self.brotli_quality = app.config.setdefault('COMPRESS_BROTLI_QUALITY', 5)
+        self.cache_bytes = app.config.setdefault('COMPRESS_CACHE_BYTES', 16 * 1024 * 1024)
+        app.after_request(self.compress_response)
+        app.extensions['compression'] = self
+
+    @property
+    def encodings(self):
+        # In order of preference when the client accepts both equally
+        return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def compress_response(self, response):
+        if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+
+        etag, weak = response.get_etag()
+        key = (etag, request.full_path, encoding) if etag and request.method == 'GET' else None
+        compressed = self._cached(key) if key else None
+        if compressed is None:
+            compressed = self._compress(body, encoding)
+            if key:
+                self._store(key, compressed)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if etag and not weak:
+            # A strong ETag names exact bytes, so each encoding needs its own
+            response.set_etag(f'{etag}-{encoding}')
+        return response
+
+    def _compress(self, body, encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _cached(self, key):
+        with self._lock:
+            compressed = self._cache.get(key)
+            if compressed is not None:
+                self._cache.move_to_end(key)
+            return compressed
+
+    def _store(self, key, compressed):
+        if len(compressed) > self.cache_bytes:
+            return
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = compressed
+            self._cached_bytes += len(compressed)
+            while self._cached_bytes > self.cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._cached_bytes = 0
+
+
+compression = ResponseCompressor()
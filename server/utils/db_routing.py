@@ -0,0 +1,57 @@
+import time
+from functools import wraps
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+# Bind key of the optional read replica in SQLALCHEMY_BINDS
+REPLICA_BIND = 'replica'
+
+# Cookie that pins a client to the primary for a while after it wrote something
+STICKY_COOKIE = 'chillar_primary_until'
+
+
+class RoutingSession(Session):
+    """Session that sends reads from @read_only views to the replica bind.
+
+    Everything else, including any flush, goes to the primary. Without a
+    replica configured it behaves exactly like the default session.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and g.get('use_replica'):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_only(view):
+    """Route the view's queries to the read replica unless the client wrote recently"""
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        try:
+            pinned_until = float(request.cookies.get(STICKY_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        g.use_replica = pinned_until < time.time()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.pop('use_replica', None)
+    return decorated_function
+
+
+def init_db_routing(app):
+    """Give clients read-your-writes: after a successful write, pin them to the primary"""
+    if REPLICA_BIND not in app.config.get('SQLALCHEMY_BINDS', {}):
+        return
+    sticky_seconds = app.config.setdefault('REPLICA_STICKY_SECONDS', 5)
+
+    @app.after_request
+    def pin_writer_to_primary(response):
+        if request.method in ('POST', 'PUT', 'PATCH', 'DELETE') and response.status_code < 400:
+            response.set_cookie(
+                STICKY_COOKIE, str(time.time() + sticky_seconds),
+                max_age=sticky_seconds, httponly=True, samesite='Lax'
+            )
+        return response
@@ -0,0 +1,91 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from flask import jsonify
+
+logger = logging.getLogger(__name__)
+
+
+class HashingPoolFull(Exception):
+    """Raised when the hashing pool's queue is full and the request should be shed"""
+
+
+class HashingPool:
+    """Bounded thread pool for bcrypt hashing and verification.
+
+    bcrypt releases the GIL, so running it on a small pool keeps request
+    threads free for cheap endpoints while a login burst is in progress.
+    At most HASH_POOL_SIZE hashes run at once and HASH_POOL_QUEUE more may
+    wait; beyond that run() raises HashingPoolFull, which is answered with a
+    503 instead of queueing without bound.
+
+    This only helps with threaded workers (gunicorn --worker-class gthread,
+    see the Procfile): a sync worker serves one request at a time, so the
+    queue never fills and the request thread is busy either way. Size and
+    queue together must stay below GUNICORN_THREADS, leaving threads free
+    for /health and other cheap requests during a login burst.
+    """
+
+    def __init__(self, app=None):
+        self.size = None
+        self.queue = None
+        self.timeout = None
+        self._slots = None
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.size = app.config.setdefault('HASH_POOL_SIZE', os.cpu_count() or 1)
+        self.queue = app.config.setdefault('HASH_POOL_QUEUE', self.size * 4)
+        self.timeout = app.config.setdefault('HASH_POOL_TIMEOUT', 10)
+        self._slots = threading.BoundedSemaphore(self.size + self.queue)
+        threads = app.config.get('GUNICORN_THREADS')
+        if threads and self.size + self.queue >= threads:
+            logger.warning(
+                "HASH_POOL_SIZE + HASH_POOL_QUEUE (%d) is not below GUNICORN_THREADS (%d); "
+                "logins can occupy every request thread and no 503 is ever sent",
+                self.size + self.queue, threads,
+            )
+        app.extensions['hashing_pool'] = self
+        app.register_error_handler(HashingPoolFull, self._overloaded)
+
+    def _get_executor(self):
+        # Threads don't survive a fork, so each gunicorn worker builds its own pool
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='hashing')
+                    self._pid = os.getpid()
+        return self._executor
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and return its result"""
+        if self._slots is None:
+            # Used outside the app (e.g. scripts): hash inline
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolFull()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashingPoolFull()
+
+    @staticmethod
+    def _overloaded(error):
+        response = jsonify({'msg': 'Server is busy, please retry shortly'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+
+
+hashing_pool = HashingPool()
@@ -0,0 +1,33 @@
+import zlib
+from functools import wraps
+from flask import g, request, make_response
+from models import SYNC_COUNTER, current_counter
+
+def conditional_get(view=None, *, counter=SYNC_COUNTER):
+    """Answer GETs with a weak ETag and return 304 when the client's copy is current.
+
+    The tag is built from the sync counter, which every write to people,
+    events or transactions bumps, so an unchanged ledger is detected with a
+    single primary-key lookup and the view is never run. Views that only
+    depend on some tables can pass a narrower counter (or a callable picking
+    one per request); the value read is left in g.etag_version for the view.
+    """
+    if view is None:
+        return lambda view: conditional_get(view, counter=counter)
+
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        version = g.etag_version = current_counter(counter() if callable(counter) else counter)
+        args_hash = zlib.crc32(request.query_string)
+        etag = f"{request.endpoint}-{version}-{args_hash:08x}"
+
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+            response.set_etag(etag, weak=True)
+            return response
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            response.set_etag(etag, weak=True)
+        return response
+    return decorated_function
@@ -0,0 +1,232 @@
+import csv
+import json
+import logging
+import time
+from datetime import datetime
+import click
+from marshmallow import ValidationError
+from sqlalchemy import insert, select
+from extensions import db
+from models import Person, Event, Transaction, mark_lookups_changed, next_sync_version, refresh_person_balances
+from utils.money import to_money
+from utils.schemas import TransactionImportSchema
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+IMPORT_BATCH_SIZE = 1000
+# Only the first errors are kept in the report
+IMPORT_MAX_ERRORS = 100
+
+
+def guess_import_format(filename='', mimetype=''):
+    """Return 'csv' or 'ndjson' from a file name or MIME type, or None"""
+    filename = (filename or '').lower()
+    if filename.endswith('.csv') or mimetype == 'text/csv':
+        return 'csv'
+    if filename.endswith(('.ndjson', '.jsonl')) or mimetype in ('application/x-ndjson', 'application/jsonl'):
+        return 'ndjson'
+    return None
+
+
+def read_records(lines, fmt):
+    """Yield (line number, record) from an iterable of byte lines.
+
+    record is a dict of the non-empty fields, or a ValueError for a line
+    that couldn't be parsed.
+    """
+    text = (line.decode('utf-8-sig') if isinstance(line, bytes) else line for line in lines)
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {
+                key.strip(): value.strip() for key, value in row.items()
+                if key and isinstance(value, str) and value.strip()
+            }
+        return
+
+    for line_no, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, ValueError(f'Invalid JSON: {e}')
+            continue
+        if not isinstance(record, dict):
+            yield line_no, ValueError('Each line must be a JSON object')
+            continue
+        yield line_no, {
+            key: value.strip() if isinstance(value, str) else value
+            for key, value in record.items() if value not in ('', None)
+        }
+
+
+class TransactionImporter:
+    """Loads transactions in batches, creating people and events by name.
+
+    Every line is validated with TransactionImportSchema. Valid lines are
+    buffered and written IMPORT_BATCH_SIZE at a time: one query per batch
+    looks up the person/event names not seen yet, one multi-row INSERT
+    creates the missing ones, and one executemany INSERT writes the
+    transactions before the batch commits. A batch that fails to commit
+    is reported line by line and the import carries on with the next one.
+    The balances of the people involved are refreshed once at the end.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.schema = TransactionImportSchema()
+        self.imported = 0
+        self.failed = 0
+        self.people_created = 0
+        self.events_created = 0
+        self.errors = []
+        self._ids = {Person: {}, Event: {}}
+        self._touched_people = set()
+        self._started = None
+        self._finished = None
+
+    def run(self, records):
+        """Import (line number, record) pairs as produced by read_records()"""
+        self._started = time.perf_counter()
+        batch = []
+        for line_no, record in records:
+            if isinstance(record, Exception):
+                self._error(line_no, str(record))
+                continue
+            try:
+                values = self.schema.load(record)
+                values['amount'] = to_money(values['amount'])
+                values['paid_amount'] = to_money(values['paid_amount'], 'paid_amount')
+            except ValidationError as e:
+                self._error(line_no, _format_errors(e.messages))
+                continue
+            except ValueError as e:
+                self._error(line_no, str(e))
+                continue
+            batch.append((line_no, values))
+            if len(batch) >= self.batch_size:
+                self._write_batch(batch)
+                batch = []
+        if batch:
+            self._write_batch(batch)
+        self._refresh_balances()
+        self._finished = time.perf_counter()
+        logger.info("Imported %d transactions (%d failed) in %.2fs",
+                    self.imported, self.failed, self._finished - self._started)
+        return self.report()
+
+    def report(self):
+        seconds = (self._finished or time.perf_counter()) - (self._started or time.perf_counter())
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            'people_created': self.people_created,
+            'events_created': self.events_created,
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(self.imported / seconds) if seconds > 0 else self.imported,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+    def _error(self, line_no, msg):
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({'line': line_no, 'msg': msg})
+
+    def _write_batch(self, batch):
+        try:
+            version = next_sync_version()
+            now = datetime.utcnow()
+            people, people_created = self._resolve(
+                Person, Person.person_id, Person.person_name,
+                {values['person_name'] for _, values in batch}, version, now)
+            events, events_created = self._resolve(
+                Event, Event.event_id, Event.event_name,
+                {values['event_name'] for _, values in batch if values.get('event_name')}, version, now)
+            # Core insert on the table: the ORM bulk path drops None event_ids
+            # from the parameters, which splits the executemany whenever rows
+            # with and without an event alternate
+            db.session.execute(insert(Transaction.__table__), [{
+                'person_id': people[values['person_name']],
+                'event_id': events[values['event_name']] if values.get('event_name') else None,
+                'amount': values['amount'],
+                'paid_amount': values['paid_amount'],
+                'reason': values['reason'],
+                'due_date': datetime.combine(values['due_date'], datetime.min.time()),
+                'status': values['status'],
+                'created_date': now,
+                'updated_at': now,
+                'version': version,
+            } for _, values in batch])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            # Names created by the failed batch were rolled back too
+            self._ids = {Person: {}, Event: {}}
+            logger.error("Import batch starting at line %d failed: %s", batch[0][0], e)
+            for line_no, _ in batch:
+                self._error(line_no, f'Batch failed: {e}')
+            return
+        self.imported += len(batch)
+        self._touched_people.update(people[values['person_name']] for _, values in batch)
+        self.people_created += people_created
+        self.events_created += events_created
+
+    def _refresh_balances(self):
+        # Once for the whole import: refreshing after every batch would
+        # re-aggregate the same people's growing history again and again.
+        # If this fails, `flask rebuild-balances` repairs the table.
+        try:
+            refresh_person_balances(self._touched_people)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Refreshing balances after import failed: %s", e)
+
+    def _resolve(self, model, id_col, name_col, names, version, now):
+        """Return ({name: id}, rows created), creating the names that don't exist yet"""
+        known = self._ids[model]
+        missing = names - known.keys()
+        new = ()
+        if missing:
+            known.update(db.session.execute(select(name_col, id_col).where(name_col.in_(missing))).all())
+            new = missing - known.keys()
+            if new:
+                db.session.execute(insert(model).values([
+                    {name_col.key: name, 'version': version, 'updated_at': now} for name in sorted(new)
+                ]))
+                mark_lookups_changed()
+                known.update(db.session.execute(select(name_col, id_col).where(name_col.in_(new))).all())
+        return known, len(new)
+
+
+def _format_errors(messages):
+    return '; '.join(
+        f"{field}: {' '.join(errors) if isinstance(errors, list) else errors}"
+        for field, errors in messages.items()
+    )
+
+
+def init_importer(app):
+    @app.cli.command('import-transactions')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(IMPORT_FORMATS), help='Defaults to the file extension.')
+    @click.option('--batch-size', default=IMPORT_BATCH_SIZE, show_default=True)
+    def import_transactions_command(path, fmt, batch_size):
+        """Import transactions from a CSV or NDJSON file."""
+        fmt = fmt or guess_import_format(path)
+        if fmt is None:
+            raise click.UsageError('Cannot tell the format from the file name, pass --format')
+        with open(path, 'rb') as f:
+            report = TransactionImporter(batch_size).run(read_records(f, fmt))
+        click.echo(
+            f"Imported {report['imported']} transactions ({report['failed']} failed) "
+            f"in {report['seconds']}s, {report['rows_per_second']} rows/s; "
+            f"created {report['people_created']} people and {report['events_created']} events"
+        )
+        for error in report['errors']:
+            click.echo(f"line {error['line']}: {error['msg']}", err=True)
+        if report['errors_truncated']:
+            click.echo(f"... {report['failed'] - len(report['errors'])} more errors", err=True)
@@ -0,0 +1,57 @@
+import logging
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib provider is used without it
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+JSON_PROVIDERS = ('orjson', 'default')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Produces the same documents as DefaultJSONProvider (sorted keys, dates
+    as HTTP dates, Decimal as strings) except that non-ASCII text is sent
+    as UTF-8 instead of \\u escapes. Calls that pass json.dumps/json.loads
+    keyword arguments fall back to the stdlib.
+    """
+
+    def _option(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._option()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._option(indent))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Install the JSON provider named by JSON_PROVIDER ('orjson' or 'default')"""
+    name = app.config.get('JSON_PROVIDER', 'orjson')
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"JSON_PROVIDER must be one of: {', '.join(JSON_PROVIDERS)}")
+    if name == 'orjson':
+        if orjson is None:
+            logger.warning("orjson is not installed; using the stdlib JSON provider")
+            return
+        app.json = OrjsonProvider(app)
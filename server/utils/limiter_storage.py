@@ -0,0 +1,153 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from limits.storage import MovingWindowSupport, Storage
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """Rate limit storage in a SQLite file shared by every worker on the host.
+
+    Registered for ``sqlite:///relative/path.db`` and
+    ``sqlite:////absolute/path.db`` URIs, so gunicorn workers on one machine
+    share counters (and keep them across restarts) without running Redis.
+    Supports the fixed-window and moving-window strategies. Every
+    read-modify-write runs inside ``BEGIN IMMEDIATE``, which serializes
+    writers across processes.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    # Expired rows of all keys are swept after this many writes per process
+    PRUNE_EVERY = 500
+
+    def __init__(self, uri=None, timeout=5.0, **options):
+        path = uri.split('://', 1)[1] if uri else ''
+        # sqlite:///relative.db -> "relative.db", sqlite:////abs.db -> "/abs.db"
+        self.path = path[1:] if path.startswith('/') else path
+        self.timeout = float(timeout)
+        self._local = threading.local()
+        self._writes = 0
+        super().__init__(uri, **options)
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ratelimit_counter ("
+                "key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ratelimit_entry ("
+                "key TEXT NOT NULL, acquired_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_ratelimit_entry_key_acquired_at "
+                "ON ratelimit_entry (key, acquired_at)"
+            )
+
+    @property
+    def _conn(self):
+        # One connection per thread, reopened after a fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _after_write(self, conn, now):
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM ratelimit_counter WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM ratelimit_entry WHERE expires_at <= ?", (now,))
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM ratelimit_counter WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                value, expires_at = amount, now + expiry
+            else:
+                value = row[0] + amount
+                expires_at = now + expiry if elastic_expiry else row[1]
+            conn.execute(
+                "INSERT OR REPLACE INTO ratelimit_counter (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._after_write(conn, now)
+        return value
+
+    def get(self, key):
+        row = self._conn.execute(
+            "SELECT value FROM ratelimit_counter WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT expires_at FROM ratelimit_counter WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return int(row[0] if row else now)
+
+    def check(self):
+        try:
+            self._conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        with self._transaction() as conn:
+            count = conn.execute("SELECT COUNT(DISTINCT key) FROM ratelimit_counter").fetchone()[0]
+            count += conn.execute("SELECT COUNT(DISTINCT key) FROM ratelimit_entry").fetchone()[0]
+            conn.execute("DELETE FROM ratelimit_counter")
+            conn.execute("DELETE FROM ratelimit_entry")
+        return count
+
+    def clear(self, key):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM ratelimit_counter WHERE key = ?", (key,))
+            conn.execute("DELETE FROM ratelimit_entry WHERE key = ?", (key,))
+
+    def acquire_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        with self._transaction() as conn:
+            acquired = conn.execute(
+                "SELECT COUNT(*) FROM ratelimit_entry WHERE key = ? AND acquired_at > ?",
+                (key, now - expiry),
+            ).fetchone()[0]
+            if acquired + amount > limit:
+                return False
+            conn.executemany(
+                "INSERT INTO ratelimit_entry (key, acquired_at, expires_at) VALUES (?, ?, ?)",
+                [(key, now, now + expiry)] * amount,
+            )
+            conn.execute(
+                "DELETE FROM ratelimit_entry WHERE key = ? AND acquired_at <= ?", (key, now - expiry)
+            )
+            self._after_write(conn, now)
+        return True
+
+    def get_moving_window(self, key, limit, expiry):
+        now = time.time()
+        oldest, acquired = self._conn.execute(
+            "SELECT MIN(acquired_at), COUNT(*) FROM ratelimit_entry WHERE key = ? AND acquired_at > ?",
+            (key, now - expiry),
+        ).fetchone()
+        return int(oldest if oldest is not None else now), acquired
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import namedtuple
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from extensions import db
+from models import Person, Event, ChangeCounter, LOOKUP_COUNTER
+
+# (id column, name column) cached for each lookup table
+LOOKUP_COLUMNS = {
+    Person: (Person.person_id, Person.person_name),
+    Event: (Event.event_id, Event.event_name),
+}
+
+_Entry = namedtuple('_Entry', 'version checked_at rows names')
+
+
+class LookupCache:
+    """Per-process copy of the people and event tables.
+
+    Both tables are small and rarely written, so each worker keeps them in
+    memory. An entry is trusted for LOOKUP_CACHE_TTL seconds; after that one
+    primary-key read of the 'lookups' change counter tells whether another
+    worker wrote since, and the table is only reloaded if it did. Listings
+    tagged from that counter hand in the value they already read instead.
+    Commits in this process that touched either table (add_person,
+    add_event, the admin panel) drop the entries right away. Tables with more than
+    LOOKUP_CACHE_MAX_ROWS rows are not cached and callers fall back to the
+    database.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 30
+        self.max_rows = 5000
+        self._entries = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.setdefault('LOOKUP_CACHE_TTL', 30)
+        self.max_rows = app.config.setdefault('LOOKUP_CACHE_MAX_ROWS', 5000)
+        app.extensions['lookup_cache'] = self
+
+    def rows(self, model, version=None):
+        """Return [(id, name), ...] ordered by id, or None if the table is too big to cache.
+
+        Pass the lookups counter value the response is tagged with as version:
+        the rows returned are then exactly as new as that tag, and no extra
+        counter read is made.
+        """
+        entry = self._entry(model, version)
+        return entry.rows if entry else None
+
+    def has(self, model, pk):
+        """True if pk is a known row; False means "not cached", so check the database"""
+        entry = self._entry(model)
+        return entry is not None and pk in entry.names
+
+    def invalidate(self, model=None):
+        with self._lock:
+            if model is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(model, None)
+
+    def _entry(self, model, version=None):
+        if self.ttl <= 0:
+            return None
+        now = time.monotonic()
+        entry = self._entries.get(model)
+        if entry is not None and (entry.version == version if version is not None
+                                  else now - entry.checked_at < self.ttl):
+            return entry
+
+        # Read the counter before the rows: the rows are then at least as new
+        # as the version stored with them, never older.
+        if version is None:
+            version = db.session.execute(
+                select(ChangeCounter.value).where(ChangeCounter.name == LOOKUP_COUNTER)
+            ).scalar() or 0
+        if entry is not None and entry.version == version:
+            entry = entry._replace(checked_at=now)
+        else:
+            id_col, name_col = LOOKUP_COLUMNS[model]
+            rows = [tuple(row) for row in db.session.execute(
+                select(id_col, name_col).order_by(id_col).limit(self.max_rows + 1)
+            )]
+            if len(rows) > self.max_rows:
+                entry = None
+            else:
+                entry = _Entry(version, now, rows, dict(rows))
+
+        with self._lock:
+            current = self._entries.get(model)
+            if entry is None:
+                self._entries.pop(model, None)
+            elif current is None or current.version <= entry.version:
+                # A lagging replica must not replace a newer copy
+                self._entries[model] = entry
+        return entry
+
+
+lookup_cache = LookupCache()
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_lookup_write(session):
+    # models' before_flush marks transactions that bumped the lookups counter
+    if session.info.get('lookups_bumped'):
+        lookup_cache.invalidate()
@@ -0,0 +1,195 @@
+import logging
+import smtplib
+import threading
+from datetime import datetime, timedelta
+from flask_mail import Message
+from sqlalchemy import update
+from extensions import db, mail
+from models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+def enqueue_mail(subject, sender, recipients, body):
+    """Queue a mail in the outbox; it is sent once the caller's transaction commits"""
+    message = OutboxMessage(
+        subject=subject,
+        sender=sender,
+        recipients=','.join(recipients),
+        body=body,
+    )
+    db.session.add(message)
+    return message
+
+
+class MailOutbox:
+    """Delivers queued OutboxMessage rows in the background.
+
+    Each process runs at most one sender, either as a daemon thread started
+    on the first wake() (MAIL_OUTBOX_WORKER=thread) or as a separate
+    `flask mail-worker` process (MAIL_OUTBOX_WORKER=external). The sender
+    keeps one SMTP connection open between batches and closes it after
+    MAIL_OUTBOX_IDLE_SECONDS without mail. A message is claimed by pushing
+    its next_attempt_at forward with a conditional UPDATE, so several senders
+    can share the table. Failed sends are retried with exponential backoff
+    up to MAIL_OUTBOX_MAX_ATTEMPTS.
+    """
+
+    # How long a claimed message is hidden from other senders
+    CLAIM_SECONDS = 120
+    BATCH_SIZE = 50
+
+    def __init__(self, app=None):
+        self.app = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._connection = None
+        self._last_used = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('MAIL_OUTBOX_WORKER', 'thread')
+        app.config.setdefault('MAIL_OUTBOX_MAX_ATTEMPTS', 5)
+        app.config.setdefault('MAIL_OUTBOX_POLL_SECONDS', 30)
+        app.config.setdefault('MAIL_OUTBOX_IDLE_SECONDS', 60)
+        app.config.setdefault('MAIL_OUTBOX_RETRY_SECONDS', 30)
+        app.extensions['mail_outbox'] = self
+
+        @app.cli.command('mail-worker')
+        def mail_worker():
+            """Send queued mail until interrupted."""
+            self.run_forever()
+
+    def wake(self):
+        """Signal that new mail was committed, starting the sender thread if needed"""
+        if self.app.config['MAIL_OUTBOX_WORKER'] == 'thread':
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stopping.clear()
+                    self._thread = threading.Thread(
+                        target=self.run_forever, name='mail-outbox', daemon=True
+                    )
+                    self._thread.start()
+        self._wakeup.set()
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._close_connection()
+
+    def run_forever(self):
+        config = self.app.config
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            with self.app.app_context():
+                try:
+                    while self.send_pending() == self.BATCH_SIZE:
+                        pass
+                except Exception:
+                    logger.exception("Mail outbox pass failed")
+                finally:
+                    db.session.remove()
+
+            if self._connection is not None and \
+                    datetime.utcnow() - self._last_used > timedelta(seconds=config['MAIL_OUTBOX_IDLE_SECONDS']):
+                self._close_connection()
+            self._wakeup.wait(config['MAIL_OUTBOX_POLL_SECONDS'])
+        self._close_connection()
+
+    def drain(self):
+        """Send everything that is due from the calling thread, e.g. at the end of a CLI job"""
+        try:
+            while self.send_pending() == self.BATCH_SIZE:
+                pass
+        finally:
+            self._close_connection()
+
+    def send_pending(self):
+        """Send one batch of due messages and return how many were attempted"""
+        now = datetime.utcnow()
+        due = db.session.query(
+            OutboxMessage.message_id,
+            OutboxMessage.next_attempt_at,
+        ).filter(
+            OutboxMessage.status == 'pending',
+            OutboxMessage.next_attempt_at <= now,
+        ).order_by(OutboxMessage.next_attempt_at).limit(self.BATCH_SIZE).all()
+        db.session.commit()
+
+        for message_id, next_attempt_at in due:
+            claimed = db.session.execute(
+                update(OutboxMessage)
+                .where(
+                    OutboxMessage.message_id == message_id,
+                    OutboxMessage.status == 'pending',
+                    OutboxMessage.next_attempt_at == next_attempt_at,
+                )
+                .values(
+                    attempts=OutboxMessage.attempts + 1,
+                    # From the claim, not the batch start: on a slow relay
+                    # the last claims of a batch would already be expired
+                    next_attempt_at=datetime.utcnow() + timedelta(seconds=self.CLAIM_SECONDS),
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                self._deliver(db.session.get(OutboxMessage, message_id))
+        return len(due)
+
+    def _deliver(self, message):
+        try:
+            self._send(Message(
+                subject=message.subject,
+                sender=message.sender,
+                recipients=message.recipients.split(','),
+                body=message.body,
+            ))
+        except Exception as e:
+            self._close_connection()
+            if message.attempts >= self.app.config['MAIL_OUTBOX_MAX_ATTEMPTS']:
+                message.status = 'failed'
+                logger.error("Giving up on outbox message %s: %s", message.message_id, e)
+            else:
+                delay = self.app.config['MAIL_OUTBOX_RETRY_SECONDS'] * 2 ** (message.attempts - 1)
+                message.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+                logger.warning("Outbox message %s failed, retrying in %ss: %s", message.message_id, delay, e)
+            message.last_error = str(e)
+        else:
+            message.status = 'sent'
+            message.sent_at = datetime.utcnow()
+            message.last_error = None
+        db.session.commit()
+
+    def _send(self, msg):
+        try:
+            self._open_connection().send(msg)
+        except smtplib.SMTPServerDisconnected:
+            # The relay dropped our idle connection; reconnect once
+            self._close_connection()
+            self._open_connection().send(msg)
+        self._last_used = datetime.utcnow()
+
+    def _open_connection(self):
+        if self._connection is None:
+            connection = mail.connect()
+            connection.__enter__()
+            self._connection = connection
+            self._last_used = datetime.utcnow()
+        return self._connection
+
+    def _close_connection(self):
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            try:
+                connection.__exit__(None, None, None)
+            except Exception:
+                pass
+
+
+outbox = MailOutbox()
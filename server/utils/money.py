@@ -0,0 +1,21 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+CENT = Decimal('0.01')
+# Largest value the Numeric(12, 2) money columns hold
+MAX_MONEY = Decimal('9999999999.99')
+
+def to_money(value, name='amount'):
+    """Return value rounded to whole cents (half up, like Postgres) as a Decimal.
+
+    Raises ValueError if it isn't a finite number or doesn't fit the money columns.
+    """
+    try:
+        money = Decimal(str(value).strip())
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError(f"Invalid {name}: {value}")
+    if not money.is_finite():
+        raise ValueError(f"Invalid {name}: {value}")
+    money = money.quantize(CENT, ROUND_HALF_UP)
+    if abs(money) > MAX_MONEY:
+        raise ValueError(f"{name} must not exceed {MAX_MONEY}")
+    return money
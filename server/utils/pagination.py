@@ -0,0 +1,35 @@
+import base64
+from datetime import datetime
+
+def _encode(raw):
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def _decode(token):
+    padded = token + '=' * (-len(token) % 4)
+    return base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+
+def encode_cursor(key, transaction_id):
+    """Encode a (datetime sort key, transaction_id) keyset position as an opaque token"""
+    return _encode(f"{key.isoformat()}|{transaction_id}")
+
+def decode_cursor(token):
+    """Decode a token produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        key, transaction_id = _decode(token).split('|', 1)
+        return datetime.fromisoformat(key), int(transaction_id)
+    except (ValueError, UnicodeError):
+        raise ValueError(f"Invalid cursor: {token}")
+
+def encode_offset_cursor(offset):
+    """Encode a result offset, for rankings that have no stable keyset, as an opaque token"""
+    return _encode(f"offset|{offset}")
+
+def decode_offset_cursor(token):
+    """Decode a token produced by encode_offset_cursor, raising ValueError if it is malformed"""
+    try:
+        kind, offset = _decode(token).split('|', 1)
+        if kind != 'offset' or int(offset) < 0:
+            raise ValueError
+        return int(offset)
+    except (ValueError, UnicodeError):
+        raise ValueError(f"Invalid cursor: {token}")
@@ -0,0 +1,86 @@
+import logging
+from datetime import datetime
+from itertools import groupby
+import click
+from flask import current_app
+from sqlalchemy import select
+from extensions import db
+from models import Person, Event, Transaction
+from utils.mail_outbox import enqueue_mail, outbox
+from utils.serializers import format_date
+
+logger = logging.getLogger(__name__)
+
+
+def overdue_rows(today):
+    """Unpaid transactions due before today for people with an email, grouped by recipient"""
+    return db.session.execute(
+        select(
+            Person.email, Person.person_id, Person.person_name,
+            Transaction.amount, Transaction.paid_amount, Transaction.reason, Transaction.due_date,
+            Event.event_name,
+        )
+        .select_from(Transaction)
+        .join(Person, Transaction.person_id == Person.person_id)
+        .outerjoin(Event, Transaction.event_id == Event.event_id)
+        # A range scan of ix_transaction_status_due_date: only overdue rows are read
+        .where(Transaction.status == False, Transaction.due_date < today, Person.email.isnot(None))
+        .order_by(Person.email, Person.person_id, Transaction.due_date)
+        .execution_options(yield_per=1000)
+    )
+
+
+def digest_body(rows):
+    """Plain-text digest of one recipient's overdue transactions"""
+    lines = ['Hi,', '', 'The following payments are overdue:']
+    total = 0.0
+    for (person_id, person_name), items in groupby(rows, key=lambda row: (row.person_id, row.person_name)):
+        lines += ['', f'{person_name}:']
+        for row in items:
+            due = row.amount - row.paid_amount
+            total += due
+            event = f' ({row.event_name})' if row.event_name else ''
+            lines.append(f"  - {due:.2f} for {row.reason}{event}, due {format_date(row.due_date)}")
+    lines += ['', f'Total overdue: {total:.2f}']
+    return '\n'.join(lines)
+
+
+def queue_overdue_digests(sender, today=None):
+    """Queue one digest per recipient in the current transaction.
+
+    Returns (digests, transactions) counted.
+    """
+    today = today or datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    digests = transactions = 0
+    for email, rows in groupby(overdue_rows(today), key=lambda row: row.email):
+        rows = list(rows)
+        enqueue_mail(
+            subject=f'Payment reminder: {len(rows)} overdue',
+            sender=sender,
+            recipients=[email],
+            body=digest_body(rows),
+        )
+        digests += 1
+        transactions += len(rows)
+    return digests, transactions
+
+
+def init_reminders(app):
+    @app.cli.command('send-reminders')
+    @click.option('--dry-run', is_flag=True, help='Count the digests without queueing them.')
+    def send_reminders_command(dry_run):
+        """Mail one overdue digest to each person with an email address."""
+        sender = current_app.config.get('MAIL_DEFAULT_SENDER')
+        if not sender and not dry_run:
+            raise click.UsageError('Set MAIL_DEFAULT_SENDER (or MAIL_USERNAME) first')
+        digests, transactions = queue_overdue_digests(sender)
+        if dry_run:
+            db.session.rollback()
+            click.echo(f"Would send {digests} digests covering {transactions} overdue transactions")
+            return
+        db.session.commit()
+        logger.info("Queued %d reminder digests for %d overdue transactions", digests, transactions)
+        # Without a separate `flask mail-worker`, deliver before the command exits
+        if current_app.config['MAIL_OUTBOX_WORKER'] == 'thread':
+            outbox.drain()
+        click.echo(f"Queued {digests} digests covering {transactions} overdue transactions")
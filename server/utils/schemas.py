@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields, validate
+from marshmallow import EXCLUDE, Schema, fields, validate
 
 class TransactionSchema(Schema):
     person_id = fields.Integer(required=True)
@@ -9,8 +9,19 @@ class TransactionSchema(Schema):
     status = fields.Boolean(missing=False)
     paid_amount = fields.Float(missing=0.0, validate=validate.Range(min=0))
 
+class TransactionImportSchema(TransactionSchema):
+    """One line of a transaction import: people and events are referenced by name"""
+    class Meta:
+        exclude = ('person_id', 'event_id')
+        unknown = EXCLUDE
+
+    person_name = fields.String(required=True, validate=validate.Length(min=1, max=50))
+    event_name = fields.String(allow_none=True, validate=validate.Length(min=1, max=50))
+    due_date = fields.Date(required=True, format='%d-%m-%Y')
+
 class PersonSchema(Schema):
     person_name = fields.String(required=True, validate=validate.Length(min=1, max=50))
+    email = fields.Email(allow_none=True)
 
 class EventSchema(Schema):
     event_name = fields.String(required=True, validate=validate.Length(min=1, max=50))
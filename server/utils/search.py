@@ -0,0 +1,109 @@
+import re
+from sqlalchemy import DDL, event, func, literal_column, table, column
+from extensions import db
+from models import Transaction
+
+# At most this many words of a query are used
+SEARCH_MAX_TERMS = 8
+
+# SQLite (dev/test): an FTS5 table keyed by transaction_id, filled by
+# triggers. Names are weighted above reason words in the bm25 ranking.
+SQLITE_SEARCH_WEIGHTS = (1.0, 2.0, 2.0)
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transaction_search USING fts5("
+    "reason, person_name, event_name, tokenize = 'unicode61 remove_diacritics 2')",
+    """CREATE TRIGGER IF NOT EXISTS transaction_search_insert AFTER INSERT ON "transaction" BEGIN
+        INSERT INTO transaction_search (rowid, reason, person_name, event_name) VALUES (
+            new.transaction_id, new.reason,
+            (SELECT person_name FROM person WHERE person_id = new.person_id),
+            (SELECT event_name FROM event WHERE event_id = new.event_id));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transaction_search_update
+    AFTER UPDATE OF reason, person_id, event_id ON "transaction" BEGIN
+        UPDATE transaction_search SET
+            reason = new.reason,
+            person_name = (SELECT person_name FROM person WHERE person_id = new.person_id),
+            event_name = (SELECT event_name FROM event WHERE event_id = new.event_id)
+        WHERE rowid = new.transaction_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transaction_search_delete AFTER DELETE ON "transaction" BEGIN
+        DELETE FROM transaction_search WHERE rowid = old.transaction_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS person_search_rename AFTER UPDATE OF person_name ON person BEGIN
+        UPDATE transaction_search SET person_name = new.person_name
+        WHERE rowid IN (SELECT transaction_id FROM "transaction" WHERE person_id = new.person_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS event_search_rename AFTER UPDATE OF event_name ON event BEGIN
+        UPDATE transaction_search SET event_name = new.event_name
+        WHERE rowid IN (SELECT transaction_id FROM "transaction" WHERE event_id = new.event_id);
+    END""",
+]
+
+# Postgres: a tsvector column on transaction kept current by triggers and
+# covered by a GIN index. Names get weight A, the reason weight B. Unlike
+# the FTS5 tokenizer above, 'simple' keeps accents.
+POSTGRES_SEARCH_DDL = [
+    'ALTER TABLE "transaction" ADD COLUMN IF NOT EXISTS search_vector tsvector',
+    """CREATE OR REPLACE FUNCTION transaction_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(
+                (SELECT person_name FROM person WHERE person_id = NEW.person_id), '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(
+                (SELECT event_name FROM event WHERE event_id = NEW.event_id), '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.reason, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    'DROP TRIGGER IF EXISTS transaction_search_vector ON "transaction"',
+    """CREATE TRIGGER transaction_search_vector
+    BEFORE INSERT OR UPDATE OF reason, person_id, event_id ON "transaction"
+    FOR EACH ROW EXECUTE FUNCTION transaction_search_vector()""",
+    # A rename re-runs the row trigger on that person's/event's transactions
+    """CREATE OR REPLACE FUNCTION transaction_search_rename() RETURNS trigger AS $$
+    BEGIN
+        IF TG_TABLE_NAME = 'person' THEN
+            UPDATE "transaction" SET person_id = person_id WHERE person_id = NEW.person_id;
+        ELSE
+            UPDATE "transaction" SET event_id = event_id WHERE event_id = NEW.event_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+    'DROP TRIGGER IF EXISTS person_search_rename ON person',
+    """CREATE TRIGGER person_search_rename AFTER UPDATE OF person_name ON person
+    FOR EACH ROW WHEN (OLD.person_name IS DISTINCT FROM NEW.person_name)
+    EXECUTE FUNCTION transaction_search_rename()""",
+    'DROP TRIGGER IF EXISTS event_search_rename ON event',
+    """CREATE TRIGGER event_search_rename AFTER UPDATE OF event_name ON event
+    FOR EACH ROW WHEN (OLD.event_name IS DISTINCT FROM NEW.event_name)
+    EXECUTE FUNCTION transaction_search_rename()""",
+    'CREATE INDEX IF NOT EXISTS ix_transaction_search_vector ON "transaction" USING gin (search_vector)',
+]
+
+# Databases built with db.create_all() get the same index as migrated ones
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(Transaction.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(Transaction.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+
+def search_terms(q):
+    """Split a user query into lowercase words, dropping any search syntax"""
+    return re.findall(r'\w+', (q or '').lower())[:SEARCH_MAX_TERMS]
+
+
+def search_transactions(query, terms):
+    """Restrict a query over Transaction to rows matching every term as a prefix, best match first"""
+    if db.engine.dialect.name == 'postgresql':
+        tsquery = func.to_tsquery('simple', ' & '.join(f'{term}:*' for term in terms))
+        vector = literal_column('"transaction".search_vector')
+        return (query.filter(vector.op('@@')(tsquery))
+                .order_by(func.ts_rank(vector, tsquery).desc(), Transaction.transaction_id))
+
+    fts = table('transaction_search', column('rowid'))
+    match = ' '.join(f'"{term}"*' for term in terms)
+    return (query.join(fts, fts.c.rowid == Transaction.transaction_id)
+            .filter(literal_column('transaction_search').op('MATCH')(match))
+            .order_by(func.bm25(literal_column('transaction_search'), *SQLITE_SEARCH_WEIGHTS),
+                      Transaction.transaction_id))
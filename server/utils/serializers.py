@@ -0,0 +1,25 @@
+def format_date(value):
+    """DD-MM-YYYY, as strftime('%d-%m-%Y') but without parsing a format per call"""
+    return f'{value.day:02d}-{value.month:02d}-{value.year:04d}'
+
+
+def row_serializer(fields, formatters):
+    """Build a function turning a result row into a dict of the given fields.
+
+    The row's leading columns must be ``fields`` in order (extra trailing
+    columns are ignored). Work that depends only on the field list, like
+    finding which fields need a formatter, is done once here instead of
+    per row.
+    """
+    fields = tuple(fields)
+    fixups = tuple((f, formatters[f]) for f in fields if f in formatters)
+
+    if not fixups:
+        return lambda row: dict(zip(fields, row))
+
+    def serialize(row):
+        item = dict(zip(fields, row))
+        for f, fmt in fixups:
+            item[f] = fmt(item[f])
+        return item
+    return serialize